@@ -0,0 +1,370 @@
+# accuracy.py
+import json
+import os
+import shutil
+from bisect import bisect_left, insort
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from inventory import period_start, write_atomic
+
+LOG_COLUMNS = ['issued_at', 'product_id', 'model', 'granularity', 'horizon',
+               'target_date', 'predicted', 'lower', 'upper']
+
+# Running sums kept per (product_id, model, granularity, horizon)
+SUMS = ['n', 'error', 'abs_error', 'squared_error', 'abs_pct_error', 'n_pct']
+
+class AccuracyTracker:
+    """Scores issued forecasts against actual sales as the sales arrive.
+
+    Every forecast passed to ``record_forecast`` or ``record_forecasts``
+    is appended to an append-only CSV log, one row per forecast period.
+    Open forecast points are indexed by (product, granularity, period),
+    so ingesting a batch of sales only touches the points for the periods
+    in that batch, and by a sorted list of open periods per granularity
+    so completing or closing periods only visits the ones affected.
+
+    State lives in ``state_dir``: the running sums and latest sales date
+    in one small file, and the open points with their actuals in one file
+    per (granularity, period). Each call rewrites the sums file and only
+    the period files it changed.
+
+    Errors are ``predicted - actual`` (positive bias means over-forecasting)
+    and are kept as running sums per product, model, granularity and
+    horizon. A period is scored once it is complete, i.e. the latest sales
+    date reaches its last day (the test the scheduler applies), so a week
+    or month is never scored on its first few days. Its actual is the
+    total recorded for it so far: when more sales arrive for an already
+    scored period, its old contribution is retracted and the corrected one
+    added. Points are kept for ``correction_days`` after their period so
+    late sales can still be folded in; periods without any recorded sales
+    are not scored.
+    """
+    def __init__(self, inventory_manager=None, log_file=None, state_dir=None, correction_days=35):
+        self.inventory_manager = inventory_manager
+        # Files default to the inventory's data directory (its shard for a location)
+        data_dir = 'data' if inventory_manager is None else inventory_manager.data_dir
+        self.log_file = log_file or os.path.join(data_dir, 'forecast_log.csv')
+        self.state_dir = state_dir or os.path.join(data_dir, 'accuracy')
+        self.sums_file = os.path.join(self.state_dir, 'sums.json')
+        self.points_dir = os.path.join(self.state_dir, 'points')
+        # Single-file state written by earlier versions, migrated on load
+        self.legacy_state_file = os.path.join(os.path.dirname(self.state_dir), 'accuracy_state.json')
+        self.correction_days = correction_days
+        self.load_state()
+        if inventory_manager is not None:
+            inventory_manager.add_sales_listener(self.ingest_sales)
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def load_state(self):
+        """Running sums, open forecast points and the actuals scored against them"""
+        self.sums, self.points, self.periods, self.actuals = {}, {}, {}, {}
+        self.open_periods = {}
+        # (granularity, period) files to rewrite on the next save
+        self.changed = set()
+        try:
+            with open(self.sums_file) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            if os.path.exists(self.legacy_state_file):
+                self._load_legacy_state()
+                return
+            state = {'sums': [], 'last_day': None}
+        self.sums = {tuple(row[:4]): row[4:] for row in state['sums']}
+        # Latest sales date seen; decides which periods are complete
+        self.last_day = state.get('last_day')
+
+        for granularity in self._listdir(self.points_dir):
+            for name in self._listdir(os.path.join(self.points_dir, granularity)):
+                if not name.endswith('.json'):
+                    continue
+                period = name[:-len('.json')]
+                with open(os.path.join(self.points_dir, granularity, name)) as f:
+                    stored = json.load(f)
+                for product_id, model, horizon, predicted in stored['points']:
+                    self._open((product_id, granularity, period))[(model, horizon)] = predicted
+                for product_id, actual in stored['actuals']:
+                    self.actuals[(product_id, granularity, period)] = actual
+        self.changed.clear()
+
+    def _load_legacy_state(self):
+        """Read the single-file state and rewrite it in the per-period layout"""
+        with open(self.legacy_state_file) as f:
+            state = json.load(f)
+        self.sums = {tuple(row[:4]): row[4:] for row in state['sums']}
+        for product_id, granularity, period, model, horizon, predicted in state['points']:
+            self._open((product_id, granularity, period))[(model, horizon)] = predicted
+        self.actuals = {tuple(row[:3]): row[3] for row in state['actuals']}
+        self.last_day = state.get('last_day')
+        self.save_state()
+        os.remove(self.legacy_state_file)
+
+    @staticmethod
+    def _listdir(path):
+        try:
+            return sorted(os.listdir(path))
+        except FileNotFoundError:
+            return []
+
+    def _period_file(self, granularity, period):
+        return os.path.join(self.points_dir, granularity, f'{period}.json')
+
+    def save_state(self):
+        """Write the sums file and the period files changed since the last save"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        for granularity, period in self.changed:
+            path = self._period_file(granularity, period)
+            product_ids = self.periods.get((granularity, period))
+            if not product_ids:
+                # Expired, or emptied by a rebuild
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            stored = {'points': [], 'actuals': []}
+            for product_id in product_ids:
+                key = (product_id, granularity, period)
+                stored['points'].extend([product_id, model, horizon, predicted]
+                                        for (model, horizon), predicted in self.points[key].items())
+                if key in self.actuals:
+                    stored['actuals'].append([product_id, self.actuals[key]])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # json.dumps encodes in C; json.dump streams through the Python encoder
+            write_atomic(path, json.dumps(stored))
+        self.changed.clear()
+        write_atomic(self.sums_file, json.dumps({
+            'sums': [list(key) + values for key, values in self.sums.items()],
+            'last_day': self.last_day
+        }))
+
+    def _open(self, key):
+        """Forecasts of one open (product_id, granularity, period), created if needed"""
+        forecasts = self.points.get(key)
+        if forecasts is None:
+            forecasts = self.points[key] = {}
+            product_ids = self.periods.get(key[1:])
+            if product_ids is None:
+                product_ids = self.periods[key[1:]] = set()
+                insort(self.open_periods.setdefault(key[1], []), key[2])
+            product_ids.add(key[0])
+        self.changed.add(key[1:])
+        return forecasts
+
+    @staticmethod
+    def _first_open_period(granularity, last_day):
+        """Start of the earliest incomplete period; every period before it is complete
+
+        A period is complete when ``start + period <= last_day + 1 day``,
+        which holds exactly for the periods before the one containing the
+        day after ``last_day``.
+        """
+        if last_day is None:
+            return ''
+        next_day = pd.Series([pd.Timestamp(last_day) + pd.Timedelta(days=1)])
+        return period_start(next_day, granularity).iloc[0].strftime('%Y-%m-%d')
+
+    # ------------------------------------------------------------------
+    # Recording forecasts and ingesting actuals
+    # ------------------------------------------------------------------
+    def record_forecast(self, product_id, model_type, result, granularity='daily', issued_at=None):
+        """Log an issued ForecastResult and open its periods for scoring"""
+        self.record_forecasts(model_type, {product_id: result}, granularity, issued_at)
+
+    def record_forecasts(self, model_type, results, granularity='daily', issued_at=None):
+        """Log many issued forecasts, {product_id: ForecastResult}, with one write each to log and state"""
+        if not results:
+            return
+        issued_at = (issued_at or datetime.now()).isoformat(timespec='seconds')
+        periods = {product_id: [date.strftime('%Y-%m-%d') for date in result.dates]
+                   for product_id, result in results.items()}
+
+        log = pd.concat([pd.DataFrame({
+            'issued_at': issued_at,
+            'product_id': product_id,
+            'model': model_type,
+            'granularity': granularity,
+            'horizon': np.arange(1, result.horizon + 1),
+            'target_date': periods[product_id],
+            'predicted': result.mean,
+            'lower': result.lower if result.has_interval else np.nan,
+            'upper': result.upper if result.has_interval else np.nan
+        }, columns=LOG_COLUMNS) for product_id, result in results.items()], ignore_index=True)
+        write_header = not os.path.exists(self.log_file)
+        log.to_csv(self.log_file, mode='a', header=write_header, index=False)
+
+        self._seed_actuals(granularity, periods)
+        first_open = self._first_open_period(granularity, self.last_day)
+        for product_id, result in results.items():
+            for horizon, (period, predicted) in enumerate(zip(periods[product_id], result.mean.tolist()), 1):
+                key = (product_id, granularity, period)
+                forecasts = self._open(key)
+                # Only complete periods carry a scored actual
+                actual = self.actuals.get(key) if period < first_open else None
+                # A newer forecast with the same lead time replaces the older one
+                previous = forecasts.get((model_type, horizon))
+                if previous is not None and actual is not None:
+                    self._add(product_id, model_type, granularity, horizon, previous, actual, -1)
+                forecasts[(model_type, horizon)] = predicted
+                if actual is not None:
+                    self._add(product_id, model_type, granularity, horizon, predicted, actual, 1)
+        self.save_state()
+
+    def _seed_actuals(self, granularity, periods):
+        """Pick up sales already recorded for forecast periods (e.g. a forecast logged late)
+
+        ``periods`` maps product_id to its forecast periods; the rollup is
+        read once for all products that have sales in their first period
+        or later. The latest sales date is taken from the SKU versions.
+        """
+        if self.inventory_manager is None:
+            return
+        versions = self.inventory_manager.get_sku_versions()
+        last_sales = [version['last_sale'] for version in versions.values() if version.get('last_sale')]
+        if last_sales:
+            self._advance(max(last_sales))
+        product_ids = [product_id for product_id, product_periods in periods.items()
+                       if versions.get(product_id, {}).get('last_sale') is not None
+                       and product_periods[0] <= versions[product_id]['last_sale']]
+        if not product_ids:
+            return
+        rollup = self.inventory_manager.get_rollup_table(granularity, 'product')
+        rollup = rollup[rollup['product_id'].isin(product_ids)]
+        recorded = dict(zip(zip(rollup['product_id'], rollup['date'].dt.strftime('%Y-%m-%d')),
+                            rollup['quantity_sold']))
+        for product_id in product_ids:
+            for period in periods[product_id]:
+                key = (product_id, granularity, period)
+                # Points already open got their actual when it was recorded
+                if key not in self.points and (product_id, period) in recorded:
+                    self.actuals[key] = float(recorded[(product_id, period)])
+                    self.changed.add((granularity, period))
+
+    def ingest_sales(self, new_sales):
+        """Fold newly recorded sales into the scores; cost grows with the batch, not the history"""
+        sales = new_sales[['date', 'product_id', 'quantity_sold']].copy()
+        if sales.empty:
+            return
+        sales['date'] = pd.to_datetime(sales['date'])
+
+        for granularity in [granularity for granularity, periods in self.open_periods.items() if periods]:
+            first_open = self._first_open_period(granularity, self.last_day)
+            sales['period'] = period_start(sales['date'], granularity).dt.strftime('%Y-%m-%d')
+            delta = sales.groupby(['product_id', 'period'])['quantity_sold'].sum()
+            for (product_id, period), quantity in delta.items():
+                key = (product_id, granularity, period)
+                if key not in self.points:
+                    continue
+                old = self.actuals.get(key)
+                new = (old or 0) + float(quantity)
+                if period < first_open:
+                    # Already complete: correct its score
+                    for (model, horizon), predicted in self.points[key].items():
+                        if old is not None:
+                            self._add(product_id, model, granularity, horizon, predicted, old, -1)
+                        self._add(product_id, model, granularity, horizon, predicted, new, 1)
+                self.actuals[key] = new
+                self.changed.add((granularity, period))
+
+        self._advance(sales['date'].max().strftime('%Y-%m-%d'))
+        self._expire(sales['date'].max())
+        self.save_state()
+
+    def _advance(self, last_day):
+        """Move the latest sales date forward and score the periods it completes"""
+        if self.last_day is not None and last_day <= self.last_day:
+            return
+        for granularity, periods in self.open_periods.items():
+            was_open = self._first_open_period(granularity, self.last_day)
+            now_open = self._first_open_period(granularity, last_day)
+            for period in periods[bisect_left(periods, was_open):bisect_left(periods, now_open)]:
+                for product_id in self.periods[(granularity, period)]:
+                    key = (product_id, granularity, period)
+                    actual = self.actuals.get(key)
+                    if actual is None:
+                        continue
+                    for (model, horizon), predicted in self.points[key].items():
+                        self._add(product_id, model, granularity, horizon, predicted, actual, 1)
+        self.last_day = last_day
+
+    def _add(self, product_id, model, granularity, horizon, predicted, actual, sign):
+        """Add (sign=1) or retract (sign=-1) one scored point"""
+        sums = self.sums.setdefault((product_id, model, granularity, horizon), [0.0] * len(SUMS))
+        error = predicted - actual
+        sums[0] += sign
+        sums[1] += sign * error
+        sums[2] += sign * abs(error)
+        sums[3] += sign * error ** 2
+        if actual != 0:
+            sums[4] += sign * abs(error) / abs(actual)
+            sums[5] += sign
+
+    def _expire(self, latest):
+        """Close points whose period is past the correction window"""
+        cutoff = (latest - pd.Timedelta(days=self.correction_days)).strftime('%Y-%m-%d')
+        for granularity, periods in self.open_periods.items():
+            expired = bisect_left(periods, cutoff)
+            for period in periods[:expired]:
+                for product_id in self.periods.pop((granularity, period)):
+                    key = (product_id, granularity, period)
+                    del self.points[key]
+                    self.actuals.pop(key, None)
+                self.changed.add((granularity, period))
+            del periods[:expired]
+
+    def rebuild(self, sales_file=None):
+        """Recompute every score from the forecast log and a sales file
+
+        ``sales_file`` defaults to the inventory manager's sales file.
+        """
+        if sales_file is None:
+            if self.inventory_manager is None:
+                raise ValueError("rebuild needs a sales_file when the tracker has no inventory_manager")
+            sales_file = self.inventory_manager.sales_file
+        self.sums, self.points, self.periods, self.actuals = {}, {}, {}, {}
+        self.open_periods, self.changed = {}, set()
+        self.last_day = None
+        if os.path.exists(self.points_dir):
+            shutil.rmtree(self.points_dir)
+        try:
+            log = pd.read_csv(self.log_file)
+        except FileNotFoundError:
+            self.save_state()
+            return
+        for row in log.sort_values('issued_at').itertuples(index=False):
+            key = (row.product_id, row.granularity, row.target_date)
+            self._open(key)[(row.model, int(row.horizon))] = float(row.predicted)
+        self.ingest_sales(pd.read_csv(sales_file))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def summary(self, product_id=None, model_type=None, granularity=None, by_horizon=True):
+        """Running MAE, RMSE, bias and MAPE from the accumulated sums
+
+        Rows are per product, model, granularity and (unless ``by_horizon``
+        is False) horizon; filters narrow the rows before aggregation.
+        """
+        columns = ['product_id', 'model', 'granularity', 'horizon']
+        frame = pd.DataFrame([list(key) + values for key, values in self.sums.items()],
+                             columns=columns + SUMS)
+        if product_id is not None:
+            frame = frame[frame['product_id'] == product_id]
+        if model_type is not None:
+            frame = frame[frame['model'] == model_type]
+        if granularity is not None:
+            frame = frame[frame['granularity'] == granularity]
+        if not by_horizon:
+            columns = columns[:-1]
+        frame = frame.groupby(columns, as_index=False)[SUMS].sum()
+        frame = frame[frame['n'] > 0]
+
+        n = frame['n']
+        frame['mae'] = frame['abs_error'] / n
+        frame['rmse'] = np.sqrt(frame['squared_error'] / n)
+        frame['bias'] = frame['error'] / n
+        frame['mape'] = np.where(frame['n_pct'] > 0,
+                                 100 * frame['abs_pct_error'] / frame['n_pct'].where(frame['n_pct'] > 0, 1),
+                                 np.nan)
+        frame['n'] = frame['n'].round().astype(int)
+        return frame[columns + ['n', 'mae', 'rmse', 'bias', 'mape']].reset_index(drop=True)
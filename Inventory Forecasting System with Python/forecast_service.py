@@ -0,0 +1,289 @@
+# forecast_service.py
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.error import HTTPError
+from urllib.parse import urlparse, parse_qs, urlencode
+from urllib.request import Request, urlopen
+from inventory import InventoryManager
+from forecasting import DemandForecaster
+from models.forecast_result import ForecastResult
+
+class ServiceBusy(Exception):
+    """Raised when the pending-work queue in front of the pool is full"""
+    pass
+
+def _run_forecast(product_id, model_type, days, granularity, data_dir='data'):
+    """Fit a model inside a pool worker and return a JSON-ready payload"""
+    # data_dir is the service's resolved directory (a location's shard included)
+    forecaster = DemandForecaster(InventoryManager(data_dir=data_dir))
+    result, metrics = forecaster.generate_forecast(product_id, model_type, days, granularity)
+    return {
+        'product_id': product_id,
+        'model': model_type,
+        'days': days,
+        'granularity': granularity,
+        'forecast': result.to_dict(),
+        'metrics': {key: float(value) for key, value in metrics.items()}
+    }
+
+class ForecastService:
+    """Shares forecasts between clients on top of a process pool.
+
+    Concurrent identical requests (same SKU, model, horizon, granularity and
+    data version) are coalesced onto one computation, at most ``max_pending``
+    computations may be queued or running at once, and finished results are
+    cached per data version.
+    """
+    def __init__(self, inventory_manager=None, max_workers=None, max_pending=16,
+                 cache_size=256, request_timeout=300):
+        self.inventory_manager = inventory_manager or InventoryManager()
+        self.pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        self.request_timeout = request_timeout
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Re-entrant: a done callback may fire synchronously while we hold it
+        self._lock = threading.RLock()
+        self._data_lock = threading.Lock()
+        self.prepare_data()
+
+    def prepare_data(self):
+        """Bring the rollups up to date in this process
+        
+        Workers only read the rollups; if each of them found stale ones it
+        would rebuild the same files while its siblings read them.
+        """
+        with self._data_lock:
+            if os.path.exists(self.inventory_manager.sales_file):
+                self.inventory_manager.ensure_rollups()
+
+    def data_version(self):
+        """Current version of the underlying inventory data"""
+        return self.inventory_manager.get_data_version()
+
+    def forecast_etag(self, product_id, model_type, days, granularity='daily', version=None):
+        """ETag identifying a forecast for one data version"""
+        version = version or self.data_version()
+        key = f"{product_id}|{model_type}|{days}|{granularity}|{version}"
+        return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+    def get_forecast(self, product_id, model_type='ARIMA', days=30, granularity='daily'):
+        """Return (payload, etag), computing the forecast at most once per version"""
+        self.prepare_data()
+        version = self.data_version()
+        key = (product_id, model_type, days, granularity, version)
+        etag = self.forecast_etag(product_id, model_type, days, granularity, version)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key], etag
+
+            future = self._inflight.get(key)
+            if future is None:
+                # Backpressure: refuse new work instead of queueing without bound
+                if not self._slots.acquire(blocking=False):
+                    raise ServiceBusy("Forecast queue is full, retry later")
+                try:
+                    future = self.pool.submit(_run_forecast, product_id, model_type, days, granularity,
+                                              self.inventory_manager.data_dir)
+                except Exception:
+                    self._slots.release()
+                    raise
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._finish(key, done))
+
+        return future.result(timeout=self.request_timeout), etag
+
+    def _finish(self, key, future):
+        """Release the queue slot and cache a successful result"""
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._slots.release()
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_products(self):
+        """Product catalog"""
+        return self.inventory_manager.get_all_products()
+
+    def get_reorder_suggestions(self):
+        """Current reorder suggestions"""
+        return self.inventory_manager.generate_reorder_suggestions()
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: /health, /products, /reorder and /forecast"""
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+
+        try:
+            if url.path == '/health':
+                self.send_json({'status': 'ok', 'data_version': service.data_version()})
+            elif url.path == '/products':
+                self.send_json(service.get_products(), etag=self.version_etag())
+            elif url.path == '/reorder':
+                self.send_json(service.get_reorder_suggestions(), etag=self.version_etag())
+            elif url.path == '/forecast':
+                self.handle_forecast(service, params)
+            else:
+                self.send_json({'error': 'Not found'}, status=404)
+        except ServiceBusy as e:
+            self.send_json({'error': str(e)}, status=503, headers={'Retry-After': '1'})
+        except ValueError as e:
+            self.send_json({'error': str(e)}, status=400)
+        except Exception as e:
+            self.send_json({'error': f"Forecast generation failed: {str(e)}"}, status=500)
+
+    def handle_forecast(self, service, params):
+        """Serve a forecast, answering 304 when the client already has this version"""
+        product_id = params.get('product_id')
+        if not product_id:
+            raise ValueError("product_id is required")
+        model_type = params.get('model', 'ARIMA')
+        days = int(params.get('days', 30))
+        granularity = params.get('granularity', 'daily')
+
+        etag = service.forecast_etag(product_id, model_type, days, granularity)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_not_modified(etag)
+            return
+
+        payload, etag = service.get_forecast(product_id, model_type, days, granularity)
+        self.send_json(payload, etag=etag)
+
+    def version_etag(self):
+        """ETag for endpoints that depend on the whole data set"""
+        return '"' + self.server.service.data_version() + '"'
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+    def send_json(self, payload, status=200, etag=None, headers=None):
+        if etag is not None and status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_not_modified(etag)
+            return
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; clients may poll frequently
+        pass
+
+class ForecastServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, ForecastRequestHandler)
+        self.service = service
+
+class ForecastClient:
+    """Remote backend exposing the DemandForecaster/InventoryManager calls the GUI uses"""
+    def __init__(self, base_url='http://127.0.0.1:8765', timeout=300):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._etags = {}
+
+    def _get(self, path, params=None):
+        url = self.base_url + path
+        if params:
+            url += '?' + urlencode(params)
+
+        request = Request(url)
+        cached = self._etags.get(url)
+        if cached is not None:
+            request.add_header('If-None-Match', cached[0])
+
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read().decode('utf-8'))
+                etag = response.headers.get('ETag')
+        except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                return cached[1]
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except ValueError:
+                message = str(e)
+            if e.code == 400:
+                raise ValueError(message)
+            if e.code == 503:
+                raise ServiceBusy(message)
+            raise RuntimeError(message)
+
+        if etag is not None:
+            self._etags[url] = (etag, payload)
+        return payload
+
+    def generate_forecast(self, product_id, model_type, days=30, granularity='daily'):
+        """Same contract as DemandForecaster.generate_forecast"""
+        payload = self._get('/forecast', {
+            'product_id': product_id,
+            'model': model_type,
+            'days': days,
+            'granularity': granularity
+        })
+        return ForecastResult.from_dict(payload['forecast']), payload['metrics']
+
+    def plot_forecast(self, result, product_id):
+        """Plotting happens locally on the returned result"""
+        return DemandForecaster().plot_forecast(result, product_id)
+
+    def get_all_products(self):
+        return self._get('/products')
+
+    def generate_reorder_suggestions(self):
+        return self._get('/reorder')
+
+def main():
+    parser = argparse.ArgumentParser(description="Local forecast service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=16)
+    parser.add_argument('--location', default=None, help="Serve one location's shard")
+    args = parser.parse_args()
+
+    service = ForecastService(InventoryManager(args.location),
+                              max_workers=args.workers, max_pending=args.max_pending)
+    server = ForecastServer((args.host, args.port), service)
+    print(f"Forecast service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+if __name__ == "__main__":
+    main()
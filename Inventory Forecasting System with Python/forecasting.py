@@ -1,67 +1,166 @@
-# forecasting.py
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from models.arima_model import ARIMAForecaster
-from models.simple_models import SimpleForecaster
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-import warnings
-warnings.filterwarnings('ignore')
-
-class DemandForecaster:
-    def __init__(self):
-        self.arima_forecaster = ARIMAForecaster()
-        self.simple_forecaster = SimpleForecaster()
-        
-    def generate_forecast(self, product_id, model_type, days=30):
-        """Generate demand forecast using specified model"""
-        from inventory import InventoryManager
-        
-        # Get sales data
-        inventory_manager = InventoryManager()
-        sales_data = inventory_manager.get_sales_data(product_id)
-        
-        if len(sales_data) < 30:
-            raise ValueError("Insufficient data for forecasting")
-            
-        # Prepare data
-        daily_sales = sales_data.groupby('date')['quantity_sold'].sum().reset_index()
-        daily_sales = daily_sales.set_index('date')
-        
-        # Generate forecast based on model type
-        if model_type == "ARIMA":
-            forecast_df, metrics = self.arima_forecaster.forecast(daily_sales, days)
-        else:  # Simple models as fallback
-            forecast_df, metrics = self.simple_forecaster.forecast(daily_sales, days)
-            
-        return forecast_df, metrics
-        
-    def plot_forecast(self, forecast_df, product_id):
-        """Create forecast visualization"""
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot historical data
-        historical = forecast_df[forecast_df['type'] == 'historical']
-        ax.plot(historical['date'], historical['quantity_sold'], 
-                label='Historical Sales', color='blue', linewidth=2)
-        
-        # Plot forecast
-        forecast = forecast_df[forecast_df['type'] == 'forecast']
-        ax.plot(forecast['date'], forecast['predicted_demand'], 
-                label='Forecast', color='red', linewidth=2, linestyle='--')
-        
-        # Plot confidence interval if available
-        if 'confidence_lower' in forecast.columns and 'confidence_upper' in forecast.columns:
-            ax.fill_between(forecast['date'], 
-                           forecast['confidence_lower'], 
-                           forecast['confidence_upper'], 
-                           color='red', alpha=0.2, label='Confidence Interval')
-        
-        ax.set_title(f'Demand Forecast for Product {product_id}', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Quantity Sold')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
+# forecasting.py
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from models.arima_model import ARIMAForecaster, SEASONAL_PERIODS
+from models.batched_sarima import BatchedSARIMAForecaster
+from models.simple_models import SimpleForecaster
+from models.forecast_result import ForecastResult
+from sklearn.metrics import mean_squared_error, mean_absolute_error
+import warnings
+warnings.filterwarnings('ignore')
+
+# Minimum number of periods of history required per granularity
+MIN_HISTORY = {
+    'daily': 30,
+    'weekly': 12,
+    'monthly': 12
+}
+
+# Smallest equal-length group worth a batched ARIMA fit. Measured at 90
+# daily periods, fit plus holdout refit: the batch breaks even around 6-8
+# series and is only clearly faster from 32 (about 1.9x at 32, 2-2.4x up
+# to 128). The per-step covariance updates in numpy scale with the batch,
+# so it does not approach a 10x gain over the statsmodels fits.
+BATCH_MIN_SERIES = 32
+
+class DemandForecaster:
+    def __init__(self, inventory_manager=None, accuracy_tracker=None):
+        self.arima_forecaster = ARIMAForecaster()
+        self.simple_forecaster = SimpleForecaster()
+        self.inventory_manager = inventory_manager
+        # Optional AccuracyTracker that logs every issued product forecast
+        self.accuracy_tracker = accuracy_tracker
+        
+    def get_inventory_manager(self):
+        """Inventory manager used to read sales rollups"""
+        if self.inventory_manager is None:
+            from inventory import InventoryManager
+            self.inventory_manager = InventoryManager()
+        return self.inventory_manager
+        
+    def generate_forecast(self, product_id, model_type, days=30, granularity='daily'):
+        """Generate demand forecast using specified model
+        
+        ``days`` is the number of periods to forecast at the requested
+        granularity ('daily', 'weekly' or 'monthly'). Returns a
+        (ForecastResult, metrics) tuple.
+        """
+        from inventory import GRANULARITIES
+        
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+            
+        # Read pre-aggregated totals instead of re-grouping raw sales
+        inventory_manager = self.get_inventory_manager()
+        period_sales = inventory_manager.get_sales_rollup(product_id, granularity)
+        # Partly covered first/last periods would read as a drop in demand
+        period_sales = inventory_manager.complete_periods(period_sales, granularity)
+        
+        if len(period_sales) < MIN_HISTORY[granularity]:
+            raise ValueError("Insufficient data for forecasting")
+            
+        period_sales = period_sales[['date', 'quantity_sold']].set_index('date')
+        result, metrics = self.forecast_series(period_sales, model_type, days, GRANULARITIES[granularity])
+        if self.accuracy_tracker is not None:
+            self.accuracy_tracker.record_forecast(product_id, model_type, result, granularity)
+        return result, metrics
+        
+    def forecast_series(self, data, model_type, days=30, freq='D'):
+        """Fit the requested model on a prepared series indexed by date"""
+        if model_type == "ARIMA":
+            return self.arima_forecaster.forecast(data, days, freq=freq)
+        # Simple models as fallback
+        return self.simple_forecaster.forecast(data, days, freq=freq)
+        
+    def forecast_series_batch(self, datas, model_type, days=30, freq='D'):
+        """Fit the requested model on many prepared series, {key: data} -> {key: (result, metrics)}
+        
+        Seasonal ARIMA fits share one fixed order, so they go through the
+        batched engine when there are at least BATCH_MIN_SERIES of equal
+        length; anything else is fitted one by one.
+        """
+        seasonal_period = SEASONAL_PERIODS.get(freq)
+        if model_type != "ARIMA" or seasonal_period is None or len(datas) < BATCH_MIN_SERIES:
+            return {key: self.forecast_series(data, model_type, days, freq) for key, data in datas.items()}
+            
+        engine = BatchedSARIMAForecaster(seasonal_order=(1, 1, 1, seasonal_period))
+        results, failed = engine.forecast_batch(datas, days, freq=freq, min_batch=BATCH_MIN_SERIES)
+        for key in failed:
+            results[key] = self.forecast_series(datas[key], model_type, days, freq)
+        return {key: results[key] for key in datas}
+        
+    def generate_forecasts(self, product_ids, model_type, days=30, granularity='daily'):
+        """Forecast several products at once; returns {product_id: (ForecastResult, metrics)}
+        
+        Products without enough history are left out of the result.
+        """
+        from inventory import GRANULARITIES
+        
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+            
+        # One pass over the rollup table instead of one lookup per product
+        inventory_manager = self.get_inventory_manager()
+        rollup = inventory_manager.get_rollup_table(granularity, 'product')
+        rollup = rollup[rollup['product_id'].isin(product_ids)].sort_values('date')
+        rollup = inventory_manager.complete_periods(rollup, granularity)
+        groups = dict(list(rollup.groupby('product_id')))
+        
+        datas = {}
+        for product_id in product_ids:
+            period_sales = groups.get(product_id)
+            if period_sales is not None and len(period_sales) >= MIN_HISTORY[granularity]:
+                datas[product_id] = period_sales[['date', 'quantity_sold']].set_index('date')
+        fits = self.forecast_series_batch(datas, model_type, days, GRANULARITIES[granularity])
+        if self.accuracy_tracker is not None:
+            self.accuracy_tracker.record_forecasts(
+                model_type, {product_id: result for product_id, (result, _) in fits.items()}, granularity
+            )
+        return fits
+        
+    def generate_hierarchical_forecast(self, model_type, days=30, granularity='daily',
+                                       method='top_down', level='category'):
+        """Forecast the whole catalog through its Category -> Sub-Category -> product tree
+        
+        See HierarchicalForecaster.forecast for the methods; the number of
+        model fits depends on the nodes forecast, not on the SKU count.
+        """
+        from hierarchy import ProductHierarchy, HierarchicalForecaster
+        
+        hierarchy = ProductHierarchy.from_catalog(self.get_inventory_manager())
+        hierarchical_forecaster = HierarchicalForecaster(self, hierarchy)
+        return hierarchical_forecaster.forecast(model_type, days, granularity, method, level)
+        
+    def plot_forecast(self, result, product_id):
+        """Create forecast visualization from a ForecastResult (or legacy combined DataFrame)"""
+        # Materialize the combined frame only now that it is needed
+        forecast_df = result.to_dataframe() if isinstance(result, ForecastResult) else result
+        
+        fig, ax = plt.subplots(figsize=(12, 6))
+        
+        # Plot historical data
+        historical = forecast_df[forecast_df['type'] == 'historical']
+        ax.plot(historical['date'], historical['quantity_sold'], 
+                label='Historical Sales', color='blue', linewidth=2)
+        
+        # Plot forecast
+        forecast = forecast_df[forecast_df['type'] == 'forecast']
+        ax.plot(forecast['date'], forecast['predicted_demand'], 
+                label='Forecast', color='red', linewidth=2, linestyle='--')
+        
+        # Plot confidence interval if available
+        if 'confidence_lower' in forecast.columns and 'confidence_upper' in forecast.columns:
+            ax.fill_between(forecast['date'], 
+                           forecast['confidence_lower'], 
+                           forecast['confidence_upper'], 
+                           color='red', alpha=0.2, label='Confidence Interval')
+        
+        ax.set_title(f'Demand Forecast for Product {product_id}', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Quantity Sold')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        
+        plt.tight_layout()
         return fig
\ No newline at end of file
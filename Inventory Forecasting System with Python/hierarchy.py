@@ -0,0 +1,276 @@
+# hierarchy.py
+import pandas as pd
+import numpy as np
+from pandas.tseries.frequencies import to_offset
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+from inventory import GRANULARITIES
+from forecasting import MIN_HISTORY
+from models.forecast_result import ForecastResult
+
+LEVELS = ('total', 'category', 'sub_category', 'product')
+UNCATEGORIZED = 'Uncategorized'
+MINT_METHODS = ('mint_shrink', 'mint_diag')
+
+class ProductHierarchy:
+    """Total -> Category -> Sub-Category -> product tree of the catalog.
+
+    Nodes are ``(level, name)`` tuples ordered top-down; sub-category names
+    are qualified by their category. The summing matrix ``S`` is a sparse
+    (nodes x products) 0/1 matrix mapping product series to every node.
+    """
+    def __init__(self, products):
+        if not products:
+            raise ValueError("No products in the catalog")
+
+        self.product_ids = [product['product_id'] for product in products]
+        paths = [self._product_path(product) for product in products]
+
+        self.nodes = [('total', 'Total')]
+        self.nodes += [('category', name) for name in sorted({category for category, _ in paths})]
+        self.nodes += [('sub_category', name) for name in sorted({sub for _, sub in paths})]
+        self.nodes += [('product', product_id) for product_id in self.product_ids]
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+
+        rows, cols = [], []
+        for j, (product_id, (category, sub_category)) in enumerate(zip(self.product_ids, paths)):
+            for node in (('total', 'Total'), ('category', category),
+                         ('sub_category', sub_category), ('product', product_id)):
+                rows.append(self.node_index[node])
+                cols.append(j)
+        self.S = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.nodes), len(self.product_ids))
+        )
+
+    @classmethod
+    def from_catalog(cls, inventory_manager):
+        return cls(inventory_manager.get_all_products())
+
+    @staticmethod
+    def _product_path(product):
+        """(category, qualified sub-category) of a product, tolerating missing metadata"""
+        category = product.get('category')
+        sub_category = product.get('sub_category')
+        category = category if isinstance(category, str) and category else UNCATEGORIZED
+        sub_category = sub_category if isinstance(sub_category, str) and sub_category else UNCATEGORIZED
+        return category, f"{category}/{sub_category}"
+
+    def nodes_at(self, level):
+        """Indices of the nodes at one level"""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown hierarchy level: {level}")
+        return [i for i, (node_level, _) in enumerate(self.nodes) if node_level == level]
+
+    def level_matrix(self, level):
+        """Sparse (level nodes x products) membership matrix"""
+        return self.S[self.nodes_at(level)]
+
+class HierarchicalForecaster:
+    """Coherent forecasts for every node of a ProductHierarchy.
+
+    Methods:
+      - ``top_down``: fit only the nodes at ``level`` and split each forecast
+        over its products by historical proportions.
+      - ``bottom_up``: fit every product and sum upwards.
+      - ``mint_shrink``: fit every node and reconcile with MinT using a
+        shrunk covariance of the models' in-sample residuals. The
+        covariance is a dense nodes x nodes matrix, so hierarchies with
+        more than ``max_dense_nodes`` nodes use ``mint_diag`` instead.
+      - ``mint_diag``: MinT with only the residual variances, solved with
+        sparse operations; memory grows with the number of products.
+    """
+    def __init__(self, forecaster, hierarchy, proportion_window=90, max_dense_nodes=1000):
+        self.forecaster = forecaster
+        self.hierarchy = hierarchy
+        self.proportion_window = proportion_window
+        self.max_dense_nodes = max_dense_nodes
+
+    def load_history(self, granularity='daily'):
+        """Product x period matrix from the rollups, plus its date index"""
+        inventory_manager = self.forecaster.get_inventory_manager()
+        rollup = inventory_manager.get_rollup_table(granularity, 'product')
+        rollup = inventory_manager.complete_periods(rollup, granularity)
+        table = rollup.pivot_table(index='product_id', columns='date',
+                                   values='quantity_sold', aggfunc='sum', fill_value=0)
+        table = table.reindex(self.hierarchy.product_ids, fill_value=0)
+        if table.shape[1] < MIN_HISTORY[granularity]:
+            raise ValueError("Insufficient data for forecasting")
+        return table.values.astype(float), pd.DatetimeIndex(table.columns)
+
+    def forecast(self, model_type='ARIMA', days=30, granularity='daily',
+                 method='top_down', level='category'):
+        """Return ({node: ForecastResult}, metrics) for every node of the hierarchy"""
+        bottom_history, dates = self.load_history(granularity)
+        node_history = self.hierarchy.S @ bottom_history
+        freq = GRANULARITIES[granularity]
+
+        if method == 'top_down':
+            if level == 'product':
+                raise ValueError("Top-down forecasting needs an aggregate level")
+            fitted = self.hierarchy.nodes_at(level)
+        elif method in ('bottom_up',) + MINT_METHODS:
+            if method == 'mint_shrink' and len(self.hierarchy.nodes) > self.max_dense_nodes:
+                method = 'mint_diag'
+            fitted = (self.hierarchy.nodes_at('product') if method == 'bottom_up'
+                      else list(range(len(self.hierarchy.nodes))))
+        else:
+            raise ValueError(f"Unknown reconciliation method: {method}")
+
+        base, node_metrics = self._fit_nodes(fitted, node_history, dates, model_type, days, freq)
+
+        if method == 'top_down':
+            proportions = self._proportions(level, bottom_history)
+            bottom = self._stack(base, fitted, 'mean')
+            bottom_mean = proportions @ bottom
+            bottom_lower = proportions @ self._stack(base, fitted, 'lower')
+            bottom_upper = proportions @ self._stack(base, fitted, 'upper')
+        elif method == 'bottom_up':
+            bottom_mean = self._stack(base, fitted, 'mean')
+            bottom_lower = self._stack(base, fitted, 'lower')
+            bottom_upper = self._stack(base, fitted, 'upper')
+        else:
+            bottom_mean, bottom_lower, bottom_upper = self._reconcile_mint(base, fitted, method)
+
+        node_mean = self.hierarchy.S @ bottom_mean
+        first_product = self.hierarchy.nodes_at('product')[0]
+        # Product intervals are only meaningful when every base model produced one
+        product_intervals = all(base[i].has_interval for i in fitted)
+        results = {}
+        for i, node in enumerate(self.hierarchy.nodes):
+            history = pd.Series(node_history[i], index=dates, name='quantity_sold')
+            lower, upper = None, None
+            if node[0] == 'product':
+                if product_intervals:
+                    lower, upper = bottom_lower[i - first_product], bottom_upper[i - first_product]
+            elif i in base and method not in MINT_METHODS:
+                # Fitted aggregate node: its own model's interval is coherent with its mean
+                lower, upper = base[i].lower, base[i].upper
+            elif i in base:
+                # Shift the base interval by the reconciliation adjustment
+                shift = node_mean[i] - base[i].mean
+                if base[i].has_interval:
+                    lower, upper = base[i].lower + shift, base[i].upper + shift
+            results[node] = ForecastResult(
+                history=history,
+                mean=node_mean[i],
+                start=dates[-1] + to_offset(freq),
+                freq=freq,
+                lower=lower,
+                upper=upper
+            )
+
+        metrics = {
+            'method': method,
+            'model_fits': len(fitted),
+            'node_metrics': {self.hierarchy.nodes[i]: node_metrics[i] for i in fitted}
+        }
+        return results, metrics
+
+    def _fit_nodes(self, fitted, node_history, dates, model_type, days, freq):
+        """Run the (expensive) base model on the selected nodes only, as one batch"""
+        datas = {i: pd.DataFrame({'quantity_sold': node_history[i]}, index=dates) for i in fitted}
+        fits = self.forecaster.forecast_series_batch(datas, model_type, days, freq)
+        base = {i: fits[i][0] for i in fitted}
+        node_metrics = {i: fits[i][1] for i in fitted}
+        return base, node_metrics
+
+    @staticmethod
+    def _stack(base, fitted, attribute):
+        """Stack one array attribute of the base forecasts, falling back to the mean"""
+        rows = []
+        for i in fitted:
+            values = getattr(base[i], attribute)
+            rows.append(base[i].mean if values is None else values)
+        return np.vstack(rows).astype(float)
+
+    def _proportions(self, level, bottom_history):
+        """Sparse (products x level nodes) matrix of historical shares"""
+        membership = self.hierarchy.level_matrix(level)
+        recent = bottom_history[:, -self.proportion_window:].sum(axis=1)
+        parent_totals = membership @ recent
+        child_counts = np.asarray(membership.sum(axis=1)).ravel()
+
+        membership = membership.tocoo()
+        parent_total = parent_totals[membership.row]
+        # Split evenly when a whole node had no recent sales
+        shares = np.where(parent_total > 0,
+                          recent[membership.col] / np.where(parent_total > 0, parent_total, 1),
+                          1.0 / child_counts[membership.row])
+        return sparse.csr_matrix((shares, (membership.col, membership.row)),
+                                 shape=(membership.shape[1], membership.shape[0]))
+
+    def _reconcile_mint(self, base, fitted, method='mint_shrink'):
+        """MinT reconciliation of base forecasts for all nodes"""
+        S = self.hierarchy.S
+        base_mean = self._stack(base, fitted, 'mean')
+        residuals = [base[i].residuals for i in fitted]
+
+        if method == 'mint_shrink':
+            # Dense: (S' W^-1 S)^-1 S' W^-1 y, only used for small hierarchies
+            W = self._shrunk_covariance(residuals)
+            Winv_S = np.linalg.solve(W, S.toarray())
+            bottom_mean = np.linalg.solve(S.T @ Winv_S, Winv_S.T @ base_mean)
+        else:
+            bottom_mean = self._reconcile_diagonal(self._diagonal_weights(residuals), base_mean)
+
+        # Product intervals: shift each base interval by its adjustment
+        product_rows = self.hierarchy.nodes_at('product')
+        shift = bottom_mean - base_mean[product_rows]
+        bottom_lower = self._stack(base, product_rows, 'lower') + shift
+        bottom_upper = self._stack(base, product_rows, 'upper') + shift
+        return bottom_mean, bottom_lower, bottom_upper
+
+    def _diagonal_weights(self, residuals):
+        """Per-node residual variances (structural weights when residuals are missing)"""
+        if any(r is None or len(r) < 2 for r in residuals):
+            return np.asarray(self.hierarchy.S.sum(axis=1)).ravel()
+        return np.maximum([np.var(r) for r in residuals], 1e-12)
+
+    def _reconcile_diagonal(self, w, base_mean):
+        """(S' W^-1 S)^-1 S' W^-1 y for a diagonal W, without dense node matrices
+
+        The product rows of S are the identity, so S' W^-1 S = W_b^-1 +
+        C' W_a^-1 C with C the aggregate rows. Woodbury's identity leaves
+        only an (aggregates x aggregates) system to solve.
+        """
+        S = self.hierarchy.S
+        product_rows = self.hierarchy.nodes_at('product')
+        aggregate_rows = [i for i in range(len(self.hierarchy.nodes)) if i < product_rows[0]]
+        C = S[aggregate_rows]
+        w_bottom = w[product_rows]
+
+        b = w_bottom[:, None] * (S.T @ (base_mean / w[:, None]))
+        M = sparse.diags(w[aggregate_rows]) + C @ sparse.diags(w_bottom) @ C.T
+        correction = spsolve(M.tocsc(), C @ b)
+        if correction.ndim == 1:
+            correction = correction[:, None]
+        return b - w_bottom[:, None] * (C.T @ correction)
+
+    def _shrunk_covariance(self, residuals):
+        """Residual covariance shrunk towards its diagonal (Schafer-Strimmer)"""
+        n_nodes = len(residuals)
+        if any(r is None or len(r) < 2 for r in residuals):
+            # Residuals unavailable: scale by the number of products under each node
+            return np.diag(np.asarray(self.hierarchy.S.sum(axis=1)).ravel())
+
+        length = min(len(r) for r in residuals)
+        E = np.vstack([r[-length:] for r in residuals]).astype(float)
+        E = E - E.mean(axis=1, keepdims=True)
+
+        sample_cov = E @ E.T / length
+        std = np.sqrt(np.maximum(np.diag(sample_cov), 1e-12))
+        Es = E / std[:, None]
+        corr = Es @ Es.T / length
+
+        # Optimal shrinkage intensity for the off-diagonal correlations;
+        # sum_t (x_it x_jt - r_ij)^2 expanded to avoid a nodes x nodes x time array
+        off_diag = ~np.eye(n_nodes, dtype=bool)
+        Es2 = Es ** 2
+        var_corr = length / (length - 1) ** 3 * (Es2 @ Es2.T - length * corr ** 2)
+        denominator = (corr[off_diag] ** 2).sum()
+        lam = 1.0 if denominator == 0 else np.clip(var_corr[off_diag].sum() / denominator, 0, 1)
+
+        shrunk = corr * (1 - lam)
+        np.fill_diagonal(shrunk, 1.0)
+        return shrunk * np.outer(std, std)
@@ -1,155 +1,557 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import json
-import os
-
-class InventoryManager:
-    def __init__(self):
-        self.products_file = 'data/inventory_data.csv'
-        self.sales_file = 'data/sales_data.csv'
-        self.ensure_data_directory()
-        
-    def ensure_data_directory(self):
-        """Ensure data directory exists"""
-        os.makedirs('data', exist_ok=True)
-        
-    def load_sample_data(self):
-        """Generate sample data for demonstration"""
-        # Sample products
-        products_data = {
-            'product_id': ['P001', 'P002', 'P003', 'P004', 'P005'],
-            'product_name': ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones'],
-            'current_stock': [45, 120, 85, 30, 95],
-            'reorder_level': [50, 100, 80, 25, 90],
-            'cost_price': [800.0, 25.0, 45.0, 300.0, 75.0]
-        }
-        
-        products_df = pd.DataFrame(products_data)
-        products_df.to_csv(self.products_file, index=False)
-        
-        # Generate sample sales data (2 years of daily data)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=730)
-        
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        sales_data = []
-        
-        # Different sales patterns for each product
-        patterns = {
-            'P001': {'base': 2, 'trend': 0.001, 'seasonality': 0.5},
-            'P002': {'base': 5, 'trend': 0.002, 'seasonality': 0.3},
-            'P003': {'base': 3, 'trend': 0.0015, 'seasonality': 0.4},
-            'P004': {'base': 1, 'trend': 0.0005, 'seasonality': 0.6},
-            'P005': {'base': 4, 'trend': 0.002, 'seasonality': 0.2}
-        }
-        
-        for date in dates:
-            for product_id, pattern in patterns.items():
-                # Generate realistic sales with trend, seasonality, and noise
-                trend = pattern['trend'] * (date - start_date).days
-                seasonality = pattern['seasonality'] * np.sin(2 * np.pi * date.dayofyear / 365)
-                noise = np.random.normal(0, 0.2)
-                
-                sales = max(0, int(
-                    pattern['base'] + trend + seasonality + noise + np.random.poisson(1)
-                ))
-                
-                sales_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'product_id': product_id,
-                    'quantity_sold': sales
-                })
-        
-        sales_df = pd.DataFrame(sales_data)
-        sales_df.to_csv(self.sales_file, index=False)
-        
-    def get_all_products(self):
-        """Get all products from CSV"""
-        try:
-            df = pd.read_csv(self.products_file)
-            return df.to_dict('records')
-        except FileNotFoundError:
-            return []
-            
-    def add_product(self, product_data):
-        """Add new product"""
-        df = pd.read_csv(self.products_file)
-        
-        # Check if product already exists
-        if product_data['product_id'] in df['product_id'].values:
-            raise ValueError("Product ID already exists!")
-            
-        new_df = pd.DataFrame([product_data])
-        df = pd.concat([df, new_df], ignore_index=True)
-        df.to_csv(self.products_file, index=False)
-        
-    def update_product(self, product_id, product_data):
-        """Update existing product"""
-        df = pd.read_csv(self.products_file)
-        
-        if product_id not in df['product_id'].values:
-            raise ValueError("Product not found!")
-            
-        # Update the product
-        mask = df['product_id'] == product_id
-        for key, value in product_data.items():
-            df.loc[mask, key] = value
-            
-        df.to_csv(self.products_file, index=False)
-        
-    def delete_product(self, product_id):
-        """Delete product"""
-        df = pd.read_csv(self.products_file)
-        
-        if product_id not in df['product_id'].values:
-            raise ValueError("Product not found!")
-            
-        df = df[df['product_id'] != product_id]
-        df.to_csv(self.products_file, index=False)
-        
-    def get_sales_data(self, product_id):
-        """Get sales data for a specific product"""
-        try:
-            sales_df = pd.read_csv(self.sales_file)
-            product_sales = sales_df[sales_df['product_id'] == product_id].copy()
-            product_sales['date'] = pd.to_datetime(product_sales['date'])
-            product_sales = product_sales.sort_values('date')
-            return product_sales
-        except FileNotFoundError:
-            raise ValueError("Sales data not found!")
-            
-    def generate_reorder_suggestions(self):
-        """Generate reorder suggestions based on current stock and trends"""
-        products = self.get_all_products()
-        suggestions = []
-        
-        for product in products:
-            current_stock = product['current_stock']
-            reorder_level = product['reorder_level']
-            
-            if current_stock <= reorder_level:
-                # Calculate suggested order quantity
-                deficit = reorder_level - current_stock
-                safety_stock = reorder_level * 0.5  # 50% safety stock
-                suggested_order = int(deficit + safety_stock)
-                
-                # Determine urgency
-                stock_ratio = current_stock / reorder_level
-                if stock_ratio <= 0.5:
-                    urgency = "HIGH"
-                elif stock_ratio <= 0.8:
-                    urgency = "MEDIUM"
-                else:
-                    urgency = "LOW"
-                    
-                suggestions.append({
-                    'product_id': product['product_id'],
-                    'product_name': product['product_name'],
-                    'current_stock': current_stock,
-                    'reorder_level': reorder_level,
-                    'suggested_order': suggested_order,
-                    'urgency': urgency
-                })
-                
-        return suggestions
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from pandas.tseries.frequencies import to_offset
+import json
+import os
+import tempfile
+
+# Rollup granularities and the pandas frequency of their period start dates
+GRANULARITIES = {
+    'daily': 'D',
+    'weekly': 'W-MON',
+    'monthly': 'MS'
+}
+
+# Rollups are stored in one file per partition of periods, so recording a
+# sale rewrites only the partitions it touches; the value is the strftime
+# format of a period start's partition name
+ROLLUP_PARTITIONS = {
+    'daily': '%Y-%m',
+    'weekly': '%Y-%m',
+    'monthly': '%Y'
+}
+ROLLUP_LAYOUT = 'partitioned-1'
+
+def period_start(dates, granularity):
+    """Map dates to the start of their daily/weekly/monthly period"""
+    if granularity == 'daily':
+        return dates.dt.normalize()
+    if granularity == 'weekly':
+        return dates.dt.to_period('W').dt.start_time
+    if granularity == 'monthly':
+        return dates.dt.to_period('M').dt.start_time
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+def drop_partial_periods(rollup, granularity, first_day, last_day):
+    """Keep only the periods whose days all lie within [first_day, last_day]
+    
+    The first and last weekly/monthly periods of a history usually cover
+    only part of the period; fitting on them reads as a drop in demand.
+    """
+    if granularity == 'daily' or first_day is None or rollup.empty:
+        return rollup
+    starts = pd.DatetimeIndex(rollup['date'])
+    next_starts = starts + to_offset(GRANULARITIES[granularity])
+    complete = (starts >= first_day) & (next_starts <= last_day + timedelta(days=1))
+    return rollup[complete]
+
+def format_dates(dates, fmt='%Y-%m-%d'):
+    """strftime over many dates, formatting each distinct date once"""
+    dates = pd.DatetimeIndex(dates)
+    codes, uniques = pd.factorize(dates)
+    return np.asarray(uniques.strftime(fmt))[codes]
+
+def write_atomic(path, text):
+    """Write a file through a temporary sibling and os.replace
+
+    Readers in other processes see either the old or the new contents,
+    never a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def location_dir(location, data_dir='data'):
+    """Directory holding one location's shard of the data"""
+    if not location or os.sep in location or '/' in location or location.startswith('.'):
+        raise ValueError(f"Invalid location name: {location!r}")
+    return os.path.join(data_dir, 'locations', location)
+
+class InventoryManager:
+    """Catalog, stock and sales for one stock pool.
+    
+    Without a location this is the single pool under ``data/``; with one,
+    every file lives in that location's shard under ``data/locations/``,
+    so each site can be loaded, forecast and reordered on its own.
+    """
+    def __init__(self, location=None, data_dir='data'):
+        self.location = location
+        self.data_dir = data_dir if location is None else location_dir(location, data_dir)
+        self.products_file = os.path.join(self.data_dir, 'inventory_data.csv')
+        self.sales_file = os.path.join(self.data_dir, 'sales_data.csv')
+        self.rollup_dir = os.path.join(self.data_dir, 'rollups')
+        self.rollup_meta_file = os.path.join(self.rollup_dir, 'rollup_meta.json')
+        self._rollup_cache = {}
+        self.versions_file = os.path.join(self.data_dir, 'sku_versions.json')
+        self.sales_listeners = []
+        self.ensure_data_directory()
+        
+    def ensure_data_directory(self):
+        """Ensure data directory exists"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        os.makedirs(self.rollup_dir, exist_ok=True)
+        
+    def load_sample_data(self, demand_scale=1.0):
+        """Generate sample data for demonstration
+        
+        ``demand_scale`` multiplies the sales patterns, e.g. to give
+        locations different volumes.
+        """
+        # Sample products
+        products_data = {
+            'product_id': ['P001', 'P002', 'P003', 'P004', 'P005'],
+            'product_name': ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones'],
+            'current_stock': [45, 120, 85, 30, 95],
+            'reorder_level': [50, 100, 80, 25, 90],
+            'cost_price': [800.0, 25.0, 45.0, 300.0, 75.0],
+            'category': ['Computers', 'Accessories', 'Accessories', 'Computers', 'Accessories'],
+            'sub_category': ['Laptops', 'Input Devices', 'Input Devices', 'Displays', 'Audio']
+        }
+        
+        products_df = pd.DataFrame(products_data)
+        products_df.to_csv(self.products_file, index=False)
+        
+        # Generate sample sales data (2 years of daily data)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=730)
+        
+        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        sales_data = []
+        
+        # Different sales patterns for each product
+        patterns = {
+            'P001': {'base': 2, 'trend': 0.001, 'seasonality': 0.5},
+            'P002': {'base': 5, 'trend': 0.002, 'seasonality': 0.3},
+            'P003': {'base': 3, 'trend': 0.0015, 'seasonality': 0.4},
+            'P004': {'base': 1, 'trend': 0.0005, 'seasonality': 0.6},
+            'P005': {'base': 4, 'trend': 0.002, 'seasonality': 0.2}
+        }
+        
+        for date in dates:
+            for product_id, pattern in patterns.items():
+                # Generate realistic sales with trend, seasonality, and noise
+                trend = pattern['trend'] * (date - start_date).days
+                seasonality = pattern['seasonality'] * np.sin(2 * np.pi * date.dayofyear / 365)
+                noise = np.random.normal(0, 0.2)
+                
+                sales = max(0, int(demand_scale * (
+                    pattern['base'] + trend + seasonality + noise + np.random.poisson(1)
+                )))
+                
+                sales_data.append({
+                    'date': date.strftime('%Y-%m-%d'),
+                    'product_id': product_id,
+                    'quantity_sold': sales
+                })
+        
+        sales_df = pd.DataFrame(sales_data)
+        sales_df.to_csv(self.sales_file, index=False)
+        # Replaced data set: the rebuild marks every SKU's history as
+        # rewritten, and the new catalog rows count as settings changes
+        self.rebuild_rollups()
+        self.touch_skus(products_data['product_id'], settings=True)
+        
+    def get_all_products(self):
+        """Get all products from CSV"""
+        try:
+            df = pd.read_csv(self.products_file)
+        except FileNotFoundError:
+            return []
+        if self.location is not None:
+            df['location'] = self.location
+        return df.to_dict('records')
+            
+    def add_product(self, product_data):
+        """Add new product"""
+        df = pd.read_csv(self.products_file)
+        
+        # Check if product already exists
+        if product_data['product_id'] in df['product_id'].values:
+            raise ValueError("Product ID already exists!")
+        self._check_location(product_data)
+            
+        # Location comes from the shard, not from a stored column
+        new_df = pd.DataFrame([{k: v for k, v in product_data.items() if k != 'location'}])
+        df = pd.concat([df, new_df], ignore_index=True)
+        df.to_csv(self.products_file, index=False)
+        self.touch_skus([product_data['product_id']], settings=True)
+        
+    def update_product(self, product_id, product_data):
+        """Update existing product"""
+        df = pd.read_csv(self.products_file)
+        
+        if product_id not in df['product_id'].values:
+            raise ValueError("Product not found!")
+        self._check_location(product_data)
+            
+        # Update the product
+        mask = df['product_id'] == product_id
+        for key, value in product_data.items():
+            if key != 'location':
+                df.loc[mask, key] = value
+            
+        df.to_csv(self.products_file, index=False)
+        self.touch_skus([product_id], settings=True)
+        
+    def _check_location(self, product_data):
+        """Reject product data addressed to another location's shard"""
+        location = product_data.get('location')
+        if location is not None and location != self.location:
+            target = 'the unsharded inventory' if self.location is None else f"location {self.location!r}"
+            raise ValueError(f"Product belongs to location {location!r}, not {target}")
+            
+    def delete_product(self, product_id):
+        """Delete product"""
+        df = pd.read_csv(self.products_file)
+        
+        if product_id not in df['product_id'].values:
+            raise ValueError("Product not found!")
+            
+        df = df[df['product_id'] != product_id]
+        df.to_csv(self.products_file, index=False)
+        self.touch_skus([product_id], settings=True)
+        
+    def get_sales_data(self, product_id):
+        """Get sales data for a specific product"""
+        try:
+            sales_df = pd.read_csv(self.sales_file)
+            product_sales = sales_df[sales_df['product_id'] == product_id].copy()
+            product_sales['date'] = pd.to_datetime(product_sales['date'])
+            product_sales = product_sales.sort_values('date')
+            return product_sales
+        except FileNotFoundError:
+            raise ValueError("Sales data not found!")
+            
+    def record_sales(self, sales_records):
+        """Append sales records and fold them into the rollups"""
+        new_sales = pd.DataFrame(sales_records, columns=['date', 'product_id', 'quantity_sold'])
+        if new_sales.empty:
+            return
+        new_sales['date'] = pd.to_datetime(new_sales['date']).dt.strftime('%Y-%m-%d')
+        
+        # Catch up on writes that bypassed record_sales before merging into the rollups
+        if os.path.exists(self.sales_file):
+            self.ensure_rollups()
+        write_header = not os.path.exists(self.sales_file)
+        new_sales.to_csv(self.sales_file, mode='a', header=write_header, index=False)
+        self.update_rollups(new_sales)
+        self._stamp_rollups(new_sales['date'])
+        self.touch_skus(new_sales['product_id'].unique(),
+                        sales=new_sales.groupby('product_id')['date'].agg(['min', 'max']))
+        for listener in self.sales_listeners:
+            listener(new_sales)
+            
+    def add_sales_listener(self, callback):
+        """Call ``callback(new_sales)`` after every record_sales batch"""
+        self.sales_listeners.append(callback)
+        
+    def rollup_path(self, granularity, level='product'):
+        """Directory holding the partitions of one level and granularity"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        return os.path.join(self.rollup_dir, f'sales_{level}_{granularity}')
+        
+    def rollup_partitions(self, granularity, level='product'):
+        """Partition files of one rollup, oldest periods first"""
+        path = self.rollup_path(granularity, level)
+        try:
+            names = sorted(name for name in os.listdir(path) if name.endswith('.csv'))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(path, name) for name in names]
+        
+    def rebuild_rollups(self, history_changed=True):
+        """Recompute every rollup from the raw sales file
+        
+        Each partition is replaced atomically rather than deleted and
+        written again, so a concurrent reader never finds it partial;
+        partitions the new history no longer covers are removed afterwards.
+        With ``history_changed`` the sales file was replaced or edited
+        outside record_sales, so every SKU's sales history counts as
+        revised.
+        """
+        try:
+            sales_df = pd.read_csv(self.sales_file)
+        except FileNotFoundError:
+            raise ValueError("Sales data not found!")
+            
+        written = set(self.update_rollups(sales_df, replace=True))
+        for granularity in GRANULARITIES:
+            for level in ('product', 'category'):
+                for path in self.rollup_partitions(granularity, level):
+                    if path not in written:
+                        os.remove(path)
+                # Single-file rollups written before partitioning
+                legacy = self.rollup_path(granularity, level) + '.csv'
+                if os.path.exists(legacy):
+                    os.remove(legacy)
+        self._stamp_rollups(sales_df['date'], reset=True)
+        
+        if history_changed:
+            spans = pd.DataFrame({
+                'product_id': sales_df['product_id'].astype(str),
+                'date': format_dates(pd.to_datetime(sales_df['date']))
+            }).groupby('product_id')['date'].agg(['min', 'max'])
+            product_ids = set(self.get_sku_versions(sync=False)) | set(spans.index)
+            self.touch_skus(sorted(product_ids), sales=spans, replace_history=True)
+        
+    def ensure_rollups(self):
+        """Rebuild the rollups if the sales file changed behind their back
+        
+        The rollups record the version of the sales file they were built
+        from; a write that bypassed record_sales (an import, a copied data
+        directory) shows up as a different version. Rollups in an older
+        storage layout are rebuilt as well.
+        """
+        meta = self.get_rollup_meta()
+        sales_changed = meta.get('sales_version') != self._file_token(self.sales_file)
+        if sales_changed or meta.get('layout') != ROLLUP_LAYOUT:
+            self.rebuild_rollups(history_changed=sales_changed)
+            
+    def get_rollup_meta(self):
+        """Bookkeeping stored next to the rollups"""
+        try:
+            with open(self.rollup_meta_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+            
+    def _stamp_rollups(self, dates, reset=False):
+        """Record that the rollups now match the current sales file and the days they span"""
+        meta = {} if reset else self.get_rollup_meta()
+        meta['sales_version'] = self._file_token(self.sales_file)
+        meta['layout'] = ROLLUP_LAYOUT
+        dates = pd.to_datetime(dates)
+        if len(dates):
+            first, last = dates.min().strftime('%Y-%m-%d'), dates.max().strftime('%Y-%m-%d')
+            meta['first_date'] = min(first, meta.get('first_date', first))
+            meta['last_date'] = max(last, meta.get('last_date', last))
+        write_atomic(self.rollup_meta_file, json.dumps(meta))
+        
+    def update_rollups(self, new_sales, replace=False):
+        """Add a batch of raw sales to the daily, weekly and monthly totals
+        
+        Only the new rows are aggregated, and only the rollup partitions
+        holding their periods are read and rewritten; a sale for today
+        touches this month's daily and weekly partitions and this year's
+        monthly one. With ``replace`` the batch is the whole history and
+        every partition it covers is overwritten. Returns the paths written.
+        """
+        sales = new_sales[['date', 'product_id', 'quantity_sold']].copy()
+        sales['date'] = pd.to_datetime(sales['date'])
+        categories = self.get_product_categories()
+        written = []
+        
+        for granularity in GRANULARITIES:
+            sales['period'] = period_start(sales['date'], granularity)
+            product_delta = sales.groupby(['period', 'product_id'])['quantity_sold'].sum()
+            written += self._merge_rollup(granularity, 'product', product_delta, 'product_id', replace)
+            
+            if categories:
+                sales['category'] = sales['product_id'].map(categories)
+                category_delta = sales.dropna(subset=['category']).groupby(['period', 'category'])['quantity_sold'].sum()
+                written += self._merge_rollup(granularity, 'category', category_delta, 'category', replace)
+        return written
+                
+    def _merge_rollup(self, granularity, level, delta, key, replace=False):
+        """Merge per-period deltas into the partitions they fall in; returns the paths written"""
+        directory = self.rollup_path(granularity, level)
+        os.makedirs(directory, exist_ok=True)
+        delta = delta.rename_axis(['date', key])
+        partitions = format_dates(delta.index.get_level_values('date'), ROLLUP_PARTITIONS[granularity])
+        
+        written = []
+        for partition, part in delta.groupby(partitions):
+            path = os.path.join(directory, f'{partition}.csv')
+            if not replace and os.path.exists(path):
+                existing = pd.read_csv(path, parse_dates=['date']).set_index(['date', key])['quantity_sold']
+                part = existing.add(part, fill_value=0)
+            rollup = part.reset_index().sort_values([key, 'date'])
+            if (rollup['quantity_sold'] % 1 == 0).all():
+                # Merging through add() produces floats; keep unit counts integral
+                rollup['quantity_sold'] = rollup['quantity_sold'].astype('int64')
+            rollup['date'] = format_dates(rollup['date'])
+            write_atomic(path, rollup.to_csv(index=False))
+            written.append(path)
+        return written
+        
+    def get_product_categories(self):
+        """Map product_id to category when the catalog carries one"""
+        try:
+            df = pd.read_csv(self.products_file)
+        except FileNotFoundError:
+            return {}
+        if 'category' not in df.columns:
+            return {}
+        return df.dropna(subset=['category']).set_index('product_id')['category'].to_dict()
+        
+    def get_sales_span(self):
+        """First and last day covered by the sales history, or (None, None)"""
+        self.ensure_rollups()
+        meta = self.get_rollup_meta()
+        if 'first_date' not in meta:
+            return None, None
+        return pd.Timestamp(meta['first_date']), pd.Timestamp(meta['last_date'])
+        
+    def complete_periods(self, rollup, granularity):
+        """Drop leading/trailing periods the sales history covers only in part"""
+        first_day, last_day = self.get_sales_span()
+        return drop_partial_periods(rollup, granularity, first_day, last_day)
+        
+    def get_sales_rollup(self, product_id, granularity='daily'):
+        """Get pre-aggregated sales totals for a product
+        
+        Rollups are stored per level, not per product: this selects from
+        the all-product table (parsed once and cached while unchanged), so
+        callers that need many products should use get_rollup_table.
+        """
+        return self._read_rollup(granularity, 'product', 'product_id', product_id)
+        
+    def get_category_rollup(self, category, granularity='daily'):
+        """Get pre-aggregated sales totals for a category"""
+        return self._read_rollup(granularity, 'category', 'category', category)
+        
+    def get_rollup_table(self, granularity='daily', level='product'):
+        """Get the full rollup for one level, e.g. to build per-SKU matrices"""
+        return self._load_rollup(granularity, level).copy()
+        
+    def _load_rollup(self, granularity, level):
+        """Parsed rollup table, re-reading only the partitions that changed
+        
+        Rows come partition by partition, oldest first, so each key's
+        periods are in date order.
+        """
+        key = 'product_id' if level == 'product' else level
+        self.ensure_rollups()
+        paths = self.rollup_partitions(granularity, level)
+        tokens = tuple((path, self._file_token(path)) for path in paths)
+        cached = self._rollup_cache.get((granularity, level))
+        if cached is not None and cached[0] == tokens:
+            return cached[1]
+            
+        frames = []
+        for path, token in tokens:
+            part = self._rollup_cache.get(path)
+            if part is None or part[0] != token:
+                try:
+                    part = (token, pd.read_csv(path, parse_dates=['date']))
+                except FileNotFoundError:
+                    # Removed by a concurrent rebuild
+                    continue
+                self._rollup_cache[path] = part
+            frames.append(part[1])
+        if frames:
+            rollup = pd.concat(frames, ignore_index=True)
+        else:
+            # No rows at this level (e.g. catalog without categories)
+            rollup = pd.DataFrame(columns=['date', key, 'quantity_sold'])
+        self._rollup_cache[(granularity, level)] = (tokens, rollup)
+        return rollup
+            
+    def _read_rollup(self, granularity, level, key, value):
+        rollup = self._load_rollup(granularity, level)
+        rows = rollup[rollup[key] == value].sort_values('date')
+        return rows.reset_index(drop=True)
+        
+    def get_sku_versions(self, sync=True):
+        """Per-SKU change counters written alongside the catalog and sales
+        
+        Each entry holds ``settings`` (catalog row changes), ``sales``
+        (any recorded sale), ``revision`` (sales back-dated before the
+        SKU's latest sale date, i.e. history changed) and ``last_sale``.
+        With ``sync`` a sales file changed outside record_sales is picked
+        up first, so its SKUs read as revised.
+        """
+        if sync and os.path.exists(self.sales_file):
+            self.ensure_rollups()
+        try:
+            with open(self.versions_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+            
+    def touch_skus(self, product_ids, settings=False, sales=None, replace_history=False):
+        """Bump the version counters of the given SKUs
+        
+        ``sales`` is a frame indexed by product_id with the ``min`` and
+        ``max`` dates of the newly recorded rows. With ``replace_history``
+        it spans each SKU's whole new history instead: the sales and
+        revision counters of every given SKU are bumped and ``last_sale``
+        is reset to the new latest date (None for SKUs no longer in it).
+        """
+        versions = self.get_sku_versions(sync=False)
+        for product_id in product_ids:
+            entry = versions.setdefault(str(product_id), {
+                'settings': 0, 'sales': 0, 'revision': 0, 'last_sale': None
+            })
+            if settings:
+                entry['settings'] += 1
+            if replace_history:
+                entry['sales'] += 1
+                entry['revision'] += 1
+                entry['last_sale'] = sales.loc[product_id, 'max'] if product_id in sales.index else None
+            elif sales is not None and product_id in sales.index:
+                first, last = sales.loc[product_id, 'min'], sales.loc[product_id, 'max']
+                entry['sales'] += 1
+                if entry['last_sale'] is not None and first < entry['last_sale']:
+                    entry['revision'] += 1
+                entry['last_sale'] = max(last, entry['last_sale'] or last)
+                
+        write_atomic(self.versions_file, json.dumps(versions))
+            
+    @staticmethod
+    def _file_token(path):
+        """Modification time and size of a file, or 'missing'"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 'missing'
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        
+    def get_data_version(self):
+        """Return a token that changes whenever the product or sales files change"""
+        return '.'.join(self._file_token(path) for path in (self.products_file, self.sales_file))
+
+    def generate_reorder_suggestions(self):
+        """Generate reorder suggestions based on current stock and trends"""
+        products = self.get_all_products()
+        suggestions = []
+        
+        for product in products:
+            current_stock = product['current_stock']
+            reorder_level = product['reorder_level']
+            
+            if current_stock <= reorder_level:
+                # Calculate suggested order quantity
+                deficit = reorder_level - current_stock
+                safety_stock = reorder_level * 0.5  # 50% safety stock
+                suggested_order = int(deficit + safety_stock)
+                
+                # Determine urgency
+                stock_ratio = current_stock / reorder_level
+                if stock_ratio <= 0.5:
+                    urgency = "HIGH"
+                elif stock_ratio <= 0.8:
+                    urgency = "MEDIUM"
+                else:
+                    urgency = "LOW"
+                    
+                suggestions.append({
+                    'location': self.location,
+                    'product_id': product['product_id'],
+                    'product_name': product['product_name'],
+                    'current_stock': current_stock,
+                    'reorder_level': reorder_level,
+                    'suggested_order': suggested_order,
+                    'urgency': urgency
+                })
+                
+        return suggestions
@@ -0,0 +1,543 @@
+# models/batched_sarima.py
+import numpy as np
+from pandas.tseries.frequencies import to_offset
+from sklearn.metrics import mean_squared_error, mean_absolute_error
+from models.forecast_result import ForecastResult
+import warnings
+warnings.filterwarnings('ignore')
+
+# statsmodels' approximate diffuse prior variance
+INITIAL_VARIANCE = 1e6
+LOG_2PI = np.log(2 * np.pi)
+# Enough doublings for any stationary ARMA block short of a unit root
+LYAPUNOV_DOUBLINGS = 60
+Z_95 = 1.959963984540054
+
+class BatchedSARIMAForecaster:
+    """Fixed-order SARIMA fitted for many equal-length series at once.
+
+    Mirrors ``SARIMAX(order, seasonal_order, enforce_stationarity=False,
+    enforce_invertibility=False)`` as used by ARIMAForecaster: same state
+    space form, approximate diffuse initialization, likelihood burn-in,
+    CSS starting values and parameterization (sigma2 optimized through its
+    square root). Every Kalman recursion runs on stacked arrays of shape
+    (series, states, states) and all parameter vectors take BFGS steps in
+    lockstep, so the Python overhead is paid per batch instead of per SKU.
+
+    The likelihood keeps the full state (difference states plus the ARMA
+    block) because differencing the data first changes the diffuse-prior
+    likelihood; the sparse transition is applied by index shifts instead
+    of matrix products.
+
+    With ``enforce=True`` the model is SARIMAX's default instead (as used
+    by ARIMAForecaster's holdout refit): AR and MA parameters are
+    optimized through the same stationarity/invertibility transform,
+    non-stationary or non-invertible starting values are replaced by
+    zeros, and the ARMA block starts from its stationary covariance.
+    """
+    def __init__(self, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7), maxiter=50, enforce=False):
+        p, d, q = order
+        P, D, Q, s = seasonal_order
+        if d != 1 or D != 1:
+            raise ValueError("The batched engine supports one regular and one seasonal difference")
+        self.p, self.q, self.P, self.Q, self.s = p, q, P, Q, s
+        self.k_params = p + q + P + Q + 1
+        self.k_order = max(p + P * s, q + Q * s + 1)
+        self.k_diff_states = 1 + s
+        self.maxiter = maxiter
+        self.enforce = enforce
+        # Periods left out of the likelihood, as statsmodels' loglikelihood_burn
+        self.burn = self.k_diff_states + (0 if enforce else self.k_order)
+
+    # ------------------------------------------------------------------
+    # Parameters and system matrices
+    # ------------------------------------------------------------------
+    def _split(self, params):
+        p, q, P, Q = self.p, self.q, self.P, self.Q
+        ar = params[:, :p]
+        ma = params[:, p:p + q]
+        seasonal_ar = params[:, p + q:p + q + P]
+        seasonal_ma = params[:, p + q + P:p + q + P + Q]
+        sigma2 = params[:, -1]
+        return ar, ma, seasonal_ar, seasonal_ma, sigma2
+
+    def _polynomial_blocks(self):
+        """(columns, sign) of the AR, MA, seasonal AR and seasonal MA parameters"""
+        p, q, P, Q = self.p, self.q, self.P, self.Q
+        return [(slice(0, p), 1), (slice(p, p + q), -1),
+                (slice(p + q, p + q + P), 1), (slice(p + q + P, p + q + P + Q), -1)]
+
+    def transform_params(self, unconstrained):
+        """Map optimizer values to model parameters, as SARIMAX.transform_params"""
+        params = unconstrained.copy()
+        if self.enforce:
+            for columns, sign in self._polynomial_blocks():
+                params[:, columns] = sign * self._constrain_stationary(unconstrained[:, columns])
+        params[:, -1] = unconstrained[:, -1] ** 2
+        return params
+
+    def untransform_params(self, params):
+        """Inverse of transform_params"""
+        unconstrained = params.astype(float).copy()
+        if self.enforce:
+            for columns, sign in self._polynomial_blocks():
+                unconstrained[:, columns] = self._unconstrain_stationary(sign * params[:, columns])
+        unconstrained[:, -1] = np.sqrt(params[:, -1])
+        return unconstrained
+
+    @staticmethod
+    def _constrain_stationary(unconstrained):
+        """Batched Monahan (1984) transform, as constrain_stationary_univariate"""
+        n, order = unconstrained.shape
+        r = unconstrained / np.sqrt(1 + unconstrained ** 2)
+        y = np.zeros((n, order, order))
+        for k in range(order):
+            for i in range(k):
+                y[:, k, i] = y[:, k - 1, i] + r[:, k] * y[:, k - 1, k - i - 1]
+            y[:, k, k] = r[:, k]
+        return -y[:, -1, :] if order else unconstrained.copy()
+
+    @staticmethod
+    def _unconstrain_stationary(constrained):
+        """Inverse of _constrain_stationary"""
+        n, order = constrained.shape
+        if order == 0:
+            return constrained.copy()
+        y = np.zeros((n, order, order))
+        y[:, -1, :] = -constrained
+        for k in range(order - 1, 0, -1):
+            for i in range(k):
+                y[:, k - 1, i] = (y[:, k, i] - y[:, k, k] * y[:, k, k - i - 1]) / (1 - y[:, k, k] ** 2)
+        r = np.diagonal(y, axis1=1, axis2=2)
+        return r / np.sqrt(1 - r ** 2)
+
+    @staticmethod
+    def _is_invertible(polynomial):
+        """Per row: all roots of [1, c_1, ...] inside the unit circle, as statsmodels' is_invertible"""
+        n, order = polynomial.shape
+        if order == 0:
+            return np.ones(n, dtype=bool)
+        companion = np.zeros((n, order, order))
+        companion[:, :, 0] = -polynomial
+        companion[:, np.arange(order - 1), np.arange(1, order)] = 1
+        return np.all(np.abs(np.linalg.eigvals(companion)) < 1 - 1e-10, axis=1)
+
+    def _reduced_polynomials(self, params):
+        """Coefficients of the multiplied-out AR and MA lag polynomials"""
+        ar, ma, seasonal_ar, seasonal_ma, sigma2 = self._split(params)
+        n, k, s = len(params), self.k_order, self.s
+
+        ar_poly = np.zeros((n, k + 1))
+        ar_poly[:, 0] = 1
+        ar_poly[:, 1:self.p + 1] = -ar
+        seasonal_ar_poly = np.zeros((n, k + 1))
+        seasonal_ar_poly[:, 0] = 1
+        for j in range(self.P):
+            seasonal_ar_poly[:, (j + 1) * s] = -seasonal_ar[:, j]
+
+        ma_poly = np.zeros((n, k + 1))
+        ma_poly[:, 0] = 1
+        ma_poly[:, 1:self.q + 1] = ma
+        seasonal_ma_poly = np.zeros((n, k + 1))
+        seasonal_ma_poly[:, 0] = 1
+        for j in range(self.Q):
+            seasonal_ma_poly[:, (j + 1) * s] = seasonal_ma[:, j]
+
+        reduced_ar = self._multiply(ar_poly, seasonal_ar_poly)
+        reduced_ma = self._multiply(ma_poly, seasonal_ma_poly)
+        # Transition column: c_i = -ar_i; selection vector: [1, ma_1, ...]
+        return -reduced_ar[:, 1:k + 1], reduced_ma[:, :k], sigma2
+
+    @staticmethod
+    def _multiply(a, b):
+        """Batched polynomial product, truncated to the input length"""
+        out = np.zeros_like(a)
+        for i in np.flatnonzero(np.any(b != 0, axis=0)):
+            out[:, i:] += b[:, i:i + 1] * a[:, :a.shape[1] - i]
+        return out
+
+    def _full_system(self, params):
+        """Design, transition and selection matrices of the full statsmodels form"""
+        c, r, sigma2 = self._reduced_polynomials(params)
+        n, s, kd = len(params), self.s, self.k_diff_states
+        k = kd + self.k_order
+
+        design = np.zeros(k)
+        design[0] = 1
+        design[s] = 1
+        design[kd] = 1
+
+        transition = np.zeros((n, k, k))
+        # Regular difference state carries the level forward
+        transition[:, 0, 0] = 1
+        transition[:, 0, s] = 1
+        transition[:, 0, kd] = 1
+        # Seasonal difference states
+        transition[:, 1, s] = 1
+        transition[:, 1, kd] = 1
+        for i in range(2, s + 1):
+            transition[:, i, i - 1] = 1
+        # ARMA block in Harvey's representation
+        transition[:, kd:, kd] = c
+        for i in range(self.k_order - 1):
+            transition[:, kd + i, kd + i + 1] = 1
+
+        selection = np.zeros((n, k))
+        selection[:, kd:] = r
+        return design, transition, selection, sigma2
+
+    def _initial_covariance(self, c, r, sigma2):
+        """Prior state covariance: diffuse, or stationary for the ARMA block when enforced"""
+        n, kd, m = len(c), self.k_diff_states, self.k_order
+        P = np.broadcast_to(np.eye(kd + m) * INITIAL_VARIANCE, (n, kd + m, kd + m)).copy()
+        if self.enforce:
+            # Solve P = T P T' + RQR' for the ARMA block by doubling:
+            # after j steps P holds the first 2^j terms of sum T^i RQR' T'^i
+            T = np.zeros((n, m, m))
+            T[:, :, 0] = c
+            T[:, np.arange(m - 1), np.arange(1, m)] = 1
+            stationary = sigma2[:, None, None] * r[:, :, None] * r[:, None, :]
+            with np.errstate(all='ignore'):
+                for _ in range(LYAPUNOV_DOUBLINGS):
+                    stationary = stationary + T @ stationary @ T.transpose(0, 2, 1)
+                    T = T @ T
+                    if not np.any(np.abs(T) > 1e-15):
+                        break
+            P[:, kd:, kd:] = stationary
+        return P
+
+    # ------------------------------------------------------------------
+    # Likelihood
+    # ------------------------------------------------------------------
+    def _apply_transition(self, X, c, out, axis=1):
+        """Write T @ X (axis=1) or X @ T' (axis=2) into ``out``, using the sparsity of T"""
+        s, kd = self.s, self.k_diff_states
+        if axis == 2:
+            # X @ T' is (T @ X')'; work on transposed views
+            X, out = X.transpose(0, 2, 1), out.transpose(0, 2, 1)
+        seasonal_sum = X[:, s] + X[:, kd]
+        np.add(X[:, 0], seasonal_sum, out=out[:, 0])
+        out[:, 1] = seasonal_sum
+        out[:, 2:s + 1] = X[:, 1:s]
+        np.multiply(c[:, :, None], X[:, kd:kd + 1], out=out[:, kd:])
+        out[:, kd:-1] += X[:, kd + 1:]
+        return out
+
+    def loglike(self, params, Y):
+        """Log likelihood of every row of Y (full state space, structured T)"""
+        c, r, sigma2 = self._reduced_polynomials(params)
+        n, s, kd = len(params), self.s, self.k_diff_states
+        k = kd + self.k_order
+        burn = self.burn
+        RQR = sigma2[:, None, None] * r[:, :, None] * r[:, None, :]
+
+        a = np.zeros((n, k, 1))
+        a_next = np.empty_like(a)
+        P = self._initial_covariance(c, r, sigma2)
+        # Preallocated buffers for T P and T P T'
+        TP = np.empty_like(P)
+        P_next = np.empty_like(P)
+        llf = np.zeros(n)
+
+        with np.errstate(all='ignore'):
+            for t in range(Y.shape[1]):
+                # Z selects states 0, s and kd
+                PZ = P[:, :, 0] + P[:, :, s] + P[:, :, kd]
+                F = PZ[:, 0] + PZ[:, s] + PZ[:, kd]
+                v = Y[:, t] - (a[:, 0, 0] + a[:, s, 0] + a[:, kd, 0])
+                if t >= burn:
+                    llf -= 0.5 * (LOG_2PI + np.log(F) + v ** 2 / F)
+
+                gain = PZ / F[:, None]
+                a += (gain * v[:, None])[:, :, None]
+                a, a_next = self._apply_transition(a, c, a_next), a
+                P -= gain[:, :, None] * PZ[:, None, :]
+                self._apply_transition(P, c, TP)
+                self._apply_transition(TP, c, P_next, axis=2)
+                P_next[:, kd:, kd:] += RQR
+                P, P_next = P_next, P
+
+        return llf
+
+    def _objective(self, unconstrained, Y, nobs):
+        """Average negative log likelihood, as minimized by statsmodels"""
+        value = -self.loglike(self.transform_params(unconstrained), Y) / nobs
+        return np.where(np.isfinite(value), value, np.inf)
+
+    # ------------------------------------------------------------------
+    # Starting values (conditional sum of squares, as in statsmodels)
+    # ------------------------------------------------------------------
+    def start_params(self, Y):
+        # (1 - L)(1 - L^s) applied to every row
+        s = self.s
+        W = Y[:, s + 1:] - Y[:, s:-1] - Y[:, 1:-s] + Y[:, :-s - 1]
+        ar, ma, variance = self._css(W, self.p, self.q, 1)
+        seasonal_ar, seasonal_ma, _ = self._css(W, self.P, self.Q, self.s)
+        sigma2 = np.maximum(variance, 1e-10)
+        if self.enforce:
+            # SARIMAX starts from zeros where the CSS polynomial is invalid
+            for values, sign in ((ar, -1), (ma, 1), (seasonal_ar, -1), (seasonal_ma, 1)):
+                values[~self._is_invertible(sign * values)] = 0
+        return np.column_stack([ar, ma, seasonal_ar, seasonal_ma, sigma2])
+
+    @staticmethod
+    def _lags(X, lags, start):
+        """Stack X[t - lag] for t >= start as regression columns"""
+        end = X.shape[1]
+        return np.stack([X[:, start - lag:end - lag] for lag in lags], axis=2)
+
+    def _css(self, W, k_ar_params, k_ma_params, step):
+        """Batched version of SARIMAX._conditional_sum_squares"""
+        n = len(W)
+        k_ar, k_ma = k_ar_params * step, k_ma_params * step
+        ar_lags = [step * (i + 1) for i in range(k_ar_params)]
+        ma_lags = [step * (i + 1) for i in range(k_ma_params)]
+        k = 2 * k_ma
+        r = max(k + k_ma, k_ar)
+
+        if k_ar + k_ma == 0:
+            return np.zeros((n, 0)), np.zeros((n, 0)), (W ** 2).mean(axis=1)
+
+        residuals = None
+        if k_ma > 0:
+            # Long AR fit to approximate the innovations
+            X = self._lags(W, range(1, k + 1), k)
+            Yk = W[:, k:]
+            beta = np.einsum('nij,nj->ni', np.linalg.pinv(X), Yk)
+            residuals = Yk - np.einsum('ntj,nj->nt', X, beta)
+
+        columns = []
+        if k_ar > 0:
+            columns.append(self._lags(W, ar_lags, r))
+        if k_ma > 0:
+            # residuals[i] corresponds to W[i + k]
+            columns.append(self._lags(residuals, ma_lags, r - k))
+        X = np.concatenate(columns, axis=2)
+        Yr = W[:, r:]
+        params = np.einsum('nij,nj->ni', np.linalg.pinv(X), Yr)
+        residuals = Yr - np.einsum('ntj,nj->nt', X, params)
+
+        variance = (residuals[:, k_ma_params:] ** 2).mean(axis=1)
+        return params[:, :k_ar_params], params[:, k_ar_params:], variance
+
+    # ------------------------------------------------------------------
+    # Lockstep optimizer
+    # ------------------------------------------------------------------
+    def fit(self, Y, start_params=None):
+        """Estimate parameters for every row of Y; returns (params, converged)"""
+        Y = np.asarray(Y, dtype=float)
+        n, nobs = Y.shape
+        if start_params is None:
+            start_params = self.start_params(Y)
+
+        x = self.untransform_params(start_params)
+        f = self._objective(x, Y, nobs)
+        g = self._gradient(x, f, Y, nobs)
+        H = np.broadcast_to(np.eye(self.k_params), (n, self.k_params, self.k_params)).copy()
+        active = np.isfinite(f)
+        converged = np.zeros(n, dtype=bool)
+
+        for iteration in range(self.maxiter):
+            idx = np.flatnonzero(active)
+            if len(idx) == 0:
+                break
+
+            direction = -np.einsum('nij,nj->ni', H[idx], g[idx])
+            slope = (direction * g[idx]).sum(axis=1)
+            # Restart from steepest descent where H lost positive definiteness
+            bad = slope >= 0
+            if bad.any():
+                H[idx[bad]] = np.eye(self.k_params)
+                direction[bad] = -g[idx[bad]]
+                slope[bad] = -(g[idx[bad]] ** 2).sum(axis=1)
+
+            step, f_new = self._line_search(x[idx], f[idx], direction, slope, Y[idx], nobs)
+            moved = step > 0
+            s_vec = step[:, None] * direction
+            x_new = x[idx] + s_vec
+            g_new = self._gradient(x_new, f_new, Y[idx], nobs)
+
+            # BFGS update of the inverse Hessian, per series
+            y_vec = g_new - g[idx]
+            sy = (s_vec * y_vec).sum(axis=1)
+            update = moved & (sy > 1e-10)
+            if iteration == 0:
+                scale = np.where(update, sy / np.maximum((y_vec * y_vec).sum(axis=1), 1e-300), 1.0)
+                H[idx] *= scale[:, None, None]
+            if update.any():
+                u = idx[update]
+                rho = 1.0 / sy[update]
+                I = np.eye(self.k_params)
+                left = I - rho[:, None, None] * s_vec[update][:, :, None] * y_vec[update][:, None, :]
+                H[u] = (left @ H[u] @ left.transpose(0, 2, 1)
+                        + rho[:, None, None] * s_vec[update][:, :, None] * s_vec[update][:, None, :])
+
+            # Convergence tests mirroring L-BFGS-B's factr/pgtol defaults
+            f_old = f[idx]
+            x[idx[moved]] = x_new[moved]
+            f[idx[moved]] = f_new[moved]
+            g[idx[moved]] = g_new[moved]
+            small_change = (f_old - f[idx]) <= 2.2e-9 * np.maximum(np.maximum(np.abs(f_old), np.abs(f[idx])), 1)
+            small_gradient = np.abs(g[idx]).max(axis=1) <= 1e-5
+            done = small_gradient | (moved & small_change) | ~moved
+            converged[idx[done & (small_gradient | small_change)]] = True
+            active[idx[done]] = False
+
+        return self.transform_params(x), converged
+
+    def _gradient(self, x, f, Y, nobs, epsilon=1e-5):
+        """Forward-difference gradient, all coordinates evaluated in one batch"""
+        n, k = x.shape
+        shifted = np.repeat(x[:, None, :], k, axis=1)
+        shifted[:, np.arange(k), np.arange(k)] += epsilon
+        values = self._objective(shifted.reshape(n * k, k), np.repeat(Y, k, axis=0), nobs)
+        return (values.reshape(n, k) - f[:, None]) / epsilon
+
+    def _line_search(self, x, f, direction, slope, Y, nobs, max_halvings=30):
+        """Backtracking Armijo search run for all series together"""
+        n = len(x)
+        step = np.ones(n)
+        # Keep the first trial step from jumping absurdly far
+        norm = np.linalg.norm(direction, axis=1)
+        step = np.where(norm > 10, 10 / np.maximum(norm, 1e-300), step)
+        f_new = np.full(n, np.inf)
+        pending = np.arange(n)
+
+        for _ in range(max_halvings):
+            trial = self._objective(x[pending] + step[pending, None] * direction[pending], Y[pending], nobs)
+            ok = trial <= f[pending] + 1e-4 * step[pending] * slope[pending]
+            f_new[pending[ok]] = trial[ok]
+            pending = pending[~ok]
+            if len(pending) == 0:
+                break
+            step[pending] *= 0.5
+
+        step[pending] = 0
+        f_new[pending] = f[pending]
+        return step, f_new
+
+    # ------------------------------------------------------------------
+    # Filtering and forecasting with the full state space
+    # ------------------------------------------------------------------
+    def filter_and_forecast(self, Y, params, steps):
+        """Return (llf, residuals, mean, lower, upper) for every row of Y"""
+        Y = np.asarray(Y, dtype=float)
+        design, transition, selection, sigma2 = self._full_system(params)
+        n, k = transition.shape[:2]
+        burn = self.burn
+        RQR = sigma2[:, None, None] * selection[:, :, None] * selection[:, None, :]
+        transition_T = transition.transpose(0, 2, 1)
+
+        a = np.zeros((n, k))
+        P = self._initial_covariance(transition[:, self.k_diff_states:, self.k_diff_states],
+                                     selection[:, self.k_diff_states:], sigma2)
+        llf = np.zeros(n)
+        residuals = np.zeros_like(Y)
+
+        with np.errstate(all='ignore'):
+            for t in range(Y.shape[1]):
+                PZ = P @ design
+                F = PZ @ design
+                v = Y[:, t] - a @ design
+                residuals[:, t] = v
+                if t >= burn:
+                    llf -= 0.5 * (LOG_2PI + np.log(F) + v ** 2 / F)
+                gain = PZ / F[:, None]
+                a = a + gain * v[:, None]
+                P = P - F[:, None, None] * gain[:, :, None] * gain[:, None, :]
+                a = np.einsum('nij,nj->ni', transition, a)
+                P = transition @ P @ transition_T + RQR
+
+            mean = np.zeros((n, steps))
+            variance = np.zeros((n, steps))
+            for h in range(steps):
+                mean[:, h] = a @ design
+                variance[:, h] = (P @ design) @ design
+                a = np.einsum('nij,nj->ni', transition, a)
+                P = transition @ P @ transition_T + RQR
+
+        half_width = Z_95 * np.sqrt(np.maximum(variance, 0))
+        return llf, residuals, mean, mean - half_width, mean + half_width
+
+    def forecast_arrays(self, Y, steps):
+        """Fit and forecast a (series x time) array; returns a dict of arrays"""
+        params, converged = self.fit(Y)
+        llf, residuals, mean, lower, upper = self.filter_and_forecast(Y, params, steps)
+        return {
+            'params': params,
+            'converged': converged,
+            'llf': llf,
+            'residuals': residuals,
+            'mean': mean,
+            'lower': lower,
+            'upper': upper
+        }
+
+    def forecast_batch(self, datas, days=30, freq='D', train_window=90, min_batch=1):
+        """Forecast many series given as {key: DataFrame with 'quantity_sold'}
+
+        Returns ({key: (ForecastResult, metrics)}, failed_keys). Series are
+        grouped by training length so each group is one equal-length batch;
+        keys in groups smaller than ``min_batch`` or whose fit does not
+        converge to finite results are returned in ``failed_keys`` for the
+        caller to handle one by one.
+        """
+        groups = {}
+        for key, data in datas.items():
+            train = data['quantity_sold'].tail(train_window)
+            groups.setdefault(len(train), []).append(key)
+
+        results, failed = {}, []
+        min_length = 2 * (self.k_diff_states + self.k_order)
+        for length, keys in groups.items():
+            if length < min_length or len(keys) < min_batch:
+                failed.extend(keys)
+                continue
+
+            Y = np.vstack([datas[key]['quantity_sold'].tail(train_window).values for key in keys]).astype(float)
+            fitted = self.forecast_arrays(Y, days)
+            metrics = self._holdout_metrics(Y)
+
+            for i, key in enumerate(keys):
+                if not (fitted['converged'][i] and np.all(np.isfinite(fitted['mean'][i]))
+                        and np.all(np.isfinite(fitted['upper'][i]))):
+                    failed.append(key)
+                    continue
+                data = datas[key]
+                result = ForecastResult(
+                    history=data['quantity_sold'],
+                    mean=fitted['mean'][i],
+                    start=data.index[-1] + to_offset(freq),
+                    freq=freq,
+                    lower=fitted['lower'][i],
+                    upper=fitted['upper'][i],
+                    residuals=fitted['residuals'][i, 1 + self.s:]
+                )
+                results[key] = (result, metrics[i])
+        return results, failed
+
+    def _holdout_metrics(self, Y):
+        """RMSE/MAE of a refit on all but the most recent periods
+
+        Like ARIMAForecaster, the refit uses SARIMAX's default model with
+        stationarity and invertibility enforced.
+        """
+        test_size = min(14, Y.shape[1] // 3)
+        train = Y[:, :-test_size]
+        if test_size == 0 or train.shape[1] < 2 * (self.k_diff_states + self.k_order):
+            return [{'rmse': 0, 'mae': 0} for _ in range(len(Y))]
+
+        holdout = BatchedSARIMAForecaster((self.p, 1, self.q), (self.P, 1, self.Q, self.s),
+                                          self.maxiter, enforce=True)
+        params, _ = holdout.fit(train)
+        _, _, predicted, _, _ = holdout.filter_and_forecast(train, params, test_size)
+        metrics = []
+        for actual, pred in zip(Y[:, -test_size:], predicted):
+            if not np.all(np.isfinite(pred)):
+                metrics.append({'rmse': 0, 'mae': 0})
+                continue
+            metrics.append({
+                'rmse': np.sqrt(mean_squared_error(actual, pred)),
+                'mae': mean_absolute_error(actual, pred)
+            })
+        return metrics
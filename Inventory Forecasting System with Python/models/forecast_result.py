@@ -0,0 +1,115 @@
+# models/forecast_result.py
+import pandas as pd
+import numpy as np
+
+class ForecastResult:
+    """Compact forecast container shared by all forecasters.
+
+    Holds the predicted mean and optional interval bounds as float32 arrays,
+    the first forecast date plus a frequency instead of materialized dates,
+    and a reference to the history series rather than a copy of it.
+    Models that can cheaply expose in-sample one-step residuals attach them
+    as well; hierarchical reconciliation uses them to estimate error
+    covariance.
+    """
+    def __init__(self, history, mean, start, freq='D', lower=None, upper=None, residuals=None):
+        self.history = history
+        self.mean = self._as_array(mean)
+        self.lower = None if lower is None else self._as_array(lower)
+        self.upper = None if upper is None else self._as_array(upper)
+        self.residuals = None if residuals is None else self._as_array(residuals)
+        self.start = pd.Timestamp(start)
+        self.freq = freq
+
+    @staticmethod
+    def _as_array(values):
+        """Convert a sequence of forecast values to a float32 array"""
+        return np.asarray(values, dtype=np.float32).reshape(-1)
+
+    @property
+    def horizon(self):
+        """Number of forecast periods"""
+        return len(self.mean)
+
+    @property
+    def has_interval(self):
+        """Whether confidence bounds are available"""
+        return self.lower is not None and self.upper is not None
+
+    @property
+    def dates(self):
+        """Forecast dates, built on demand from start and frequency"""
+        return pd.date_range(start=self.start, periods=self.horizon, freq=self.freq)
+
+    def __len__(self):
+        return self.horizon
+
+    def forecast_frame(self):
+        """Forecast rows only, as a DataFrame"""
+        frame = pd.DataFrame({
+            'date': self.dates,
+            'predicted_demand': self.mean
+        })
+        if self.has_interval:
+            frame['confidence_lower'] = self.lower
+            frame['confidence_upper'] = self.upper
+        return frame
+
+    def history_frame(self):
+        """Historical rows only, as a DataFrame"""
+        return pd.DataFrame({
+            'date': self.history.index,
+            'quantity_sold': self.history.values
+        })
+
+    def to_dataframe(self):
+        """Combined historical and forecast DataFrame in the legacy layout"""
+        historical_df = self.history_frame()
+        historical_df['predicted_demand'] = historical_df['quantity_sold']
+        historical_df['type'] = 'historical'
+
+        forecast_df = self.forecast_frame()
+        forecast_df['type'] = 'forecast'
+
+        combined_df = pd.concat([historical_df, forecast_df], ignore_index=True)
+        combined_df['type'] = combined_df['type'].astype('category')
+        return combined_df
+
+    def to_csv(self, path, include_history=False):
+        """Export the forecast (optionally with history) to CSV"""
+        frame = self.to_dataframe() if include_history else self.forecast_frame()
+        frame.to_csv(path, index=False)
+
+    def to_dict(self, include_history=True):
+        """JSON-serializable representation of the result"""
+        payload = {
+            'start': self.start.isoformat(),
+            'freq': self.freq,
+            'mean': self.mean.tolist(),
+            'lower': None if self.lower is None else self.lower.tolist(),
+            'upper': None if self.upper is None else self.upper.tolist()
+        }
+        if include_history:
+            payload['history'] = {
+                'dates': [d.strftime('%Y-%m-%d') for d in self.history.index],
+                'values': self.history.values.tolist()
+            }
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload):
+        """Rebuild a result produced by to_dict"""
+        history = payload.get('history') or {'dates': [], 'values': []}
+        history_series = pd.Series(
+            history['values'],
+            index=pd.to_datetime(history['dates']),
+            name='quantity_sold'
+        )
+        return cls(
+            history=history_series,
+            mean=payload['mean'],
+            start=payload['start'],
+            freq=payload['freq'],
+            lower=payload.get('lower'),
+            upper=payload.get('upper')
+        )
@@ -0,0 +1,145 @@
+# network.py
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from inventory import InventoryManager, GRANULARITIES, location_dir, drop_partial_periods
+from forecasting import DemandForecaster, MIN_HISTORY
+
+def _forecast_location(location, data_dir, model_type, days, granularity):
+    """Forecast every product of one shard inside a pool worker"""
+    inventory_manager = InventoryManager(location, data_dir)
+    forecaster = DemandForecaster(inventory_manager)
+    product_ids = [product['product_id'] for product in inventory_manager.get_all_products()]
+    return forecaster.generate_forecasts(product_ids, model_type, days, granularity)
+
+class InventoryNetwork:
+    """Every stock location, each stored as its own InventoryManager shard.
+
+    Shards live under ``data/locations/<location>/`` and never read each
+    other's files, so adding a location leaves queries against the others
+    untouched. Network-level views are built by combining the shards'
+    catalogs and pre-aggregated rollups rather than their raw sales.
+    """
+    def __init__(self, data_dir='data'):
+        self.data_dir = data_dir
+        self.root = os.path.join(data_dir, 'locations')
+        self._shards = {}
+
+    def locations(self):
+        """Names of the locations that have a shard on disk"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def add_location(self, location):
+        """Create (or open) the shard for a location"""
+        if location not in self._shards:
+            self._shards[location] = InventoryManager(location, self.data_dir)
+        return self._shards[location]
+
+    def shard(self, location):
+        """InventoryManager for one existing location"""
+        if not os.path.isdir(location_dir(location, self.data_dir)):
+            raise ValueError(f"Unknown location: {location}")
+        return self.add_location(location)
+
+    def load_sample_data(self, locations=None, superstore_file=None):
+        """Generate sample shards
+
+        Without explicit locations, one shard is created per Region of
+        SampleSuperstore.csv, with sales volumes scaled by the region's
+        share of the quantity sold.
+        """
+        if locations is None:
+            superstore_file = superstore_file or os.path.join(self.data_dir, 'SampleSuperstore.csv')
+            quantity = pd.read_csv(superstore_file).groupby('Region')['Quantity'].sum()
+            scales = (quantity / quantity.mean()).to_dict()
+        else:
+            scales = {location: 1.0 for location in locations}
+
+        for location, scale in scales.items():
+            self.add_location(location).load_sample_data(demand_scale=scale)
+
+    def get_all_products(self):
+        """Catalog rows of every location, each tagged with its location"""
+        products = []
+        for location in self.locations():
+            products.extend(self.shard(location).get_all_products())
+        return products
+
+    def generate_reorder_suggestions(self):
+        """Reorder suggestions of every location"""
+        suggestions = []
+        for location in self.locations():
+            suggestions.extend(self.shard(location).generate_reorder_suggestions())
+        return suggestions
+
+    def get_network_stock(self):
+        """Stock and reorder levels per product summed over locations"""
+        products = pd.DataFrame(self.get_all_products())
+        if products.empty:
+            return pd.DataFrame(columns=['product_id', 'product_name', 'locations',
+                                         'current_stock', 'reorder_level'])
+        return products.groupby('product_id', as_index=False).agg(
+            product_name=('product_name', 'first'),
+            locations=('location', 'nunique'),
+            current_stock=('current_stock', 'sum'),
+            reorder_level=('reorder_level', 'sum')
+        )
+
+    def get_network_rollup(self, granularity='daily', level='product'):
+        """Network sales totals, summed from each shard's rollup"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        key = 'product_id' if level == 'product' else level
+
+        frames = []
+        for location in self.locations():
+            try:
+                frames.append(self.shard(location).get_rollup_table(granularity, level))
+            except ValueError:
+                # Location without any sales yet
+                continue
+        if not frames:
+            return pd.DataFrame(columns=['date', key, 'quantity_sold'])
+        totals = pd.concat(frames, ignore_index=True).groupby(['date', key], as_index=False)['quantity_sold'].sum()
+        return totals.sort_values([key, 'date']).reset_index(drop=True)
+
+    def forecast_locations(self, model_type='ARIMA', days=30, granularity='daily', max_workers=None):
+        """Forecast every shard in parallel; returns {location: {product_id: (ForecastResult, metrics)}}"""
+        locations = self.locations()
+        if not locations:
+            return {}
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {
+                location: pool.submit(_forecast_location, location, self.data_dir, model_type, days, granularity)
+                for location in locations
+            }
+            return {location: future.result() for location, future in futures.items()}
+
+    def forecast_network(self, model_type='ARIMA', days=30, granularity='daily'):
+        """Forecast network-wide demand per product from the aggregated rollups"""
+        rollup = self.get_network_rollup(granularity, 'product')
+        # A network period is complete only where every location's history covers it
+        spans = []
+        for location in self.locations():
+            try:
+                span = self.shard(location).get_sales_span()
+            except ValueError:
+                # Location without any sales yet
+                continue
+            if span[0] is not None:
+                spans.append(span)
+        if spans:
+            first_day = max(first for first, _ in spans)
+            last_day = min(last for _, last in spans)
+            rollup = drop_partial_periods(rollup, granularity, first_day, last_day)
+        datas = {}
+        for product_id, rows in rollup.groupby('product_id'):
+            if len(rows) >= MIN_HISTORY[granularity]:
+                datas[product_id] = rows[['date', 'quantity_sold']].set_index('date')
+        forecaster = DemandForecaster()
+        return forecaster.forecast_series_batch(datas, model_type, days, GRANULARITIES[granularity])
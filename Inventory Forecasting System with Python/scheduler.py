@@ -0,0 +1,233 @@
+# scheduler.py
+import hashlib
+import json
+import os
+import pandas as pd
+from datetime import datetime, timedelta
+from pandas.tseries.frequencies import to_offset
+from inventory import InventoryManager, GRANULARITIES
+from forecasting import DemandForecaster
+from models.forecast_result import ForecastResult
+
+# Lower rank is refitted first
+URGENCY_RANK = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+NO_REORDER_RANK = 3
+REASON_RANK = {'new': 0, 'dirty': 1, 'drift': 2, 'exhausted': 3, 'stale': 4}
+
+class ForecastScheduler:
+    """Keeps one forecast per SKU and refits only the SKUs that need it.
+
+    A SKU is due when it has no forecast yet (``new``), its catalog row or
+    sales history changed since the fit (``dirty``), the actuals that
+    arrived since then fall outside the forecast interval too often
+    (``drift``), the forecast horizon has been used up (``exhausted``) or
+    the forecast is older than ``ttl_days`` (``stale``). New sales that
+    extend the history do not by themselves make a SKU dirty; they are
+    scored against the forecast instead.
+
+    Due SKUs are refitted in order of reorder urgency, so a limited run
+    spends its budget on the products closest to a stockout.
+    """
+    def __init__(self, forecaster=None, inventory_manager=None, model_type='ARIMA', days=30,
+                 granularity='daily', ttl_days=7, drift_share=0.2, min_drift_points=3,
+                 state_file=None):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        self.inventory_manager = inventory_manager or InventoryManager()
+        self.forecaster = forecaster or DemandForecaster(self.inventory_manager)
+        self.model_type = model_type
+        self.days = days
+        self.granularity = granularity
+        self.freq = GRANULARITIES[granularity]
+        self.ttl = timedelta(days=ttl_days)
+        self.drift_share = drift_share
+        self.min_drift_points = min_drift_points
+        self.state_file = state_file or os.path.join(self.inventory_manager.data_dir, 'forecast_schedule.json')
+        self.state = self.load_state()
+
+    def load_state(self):
+        """Stored forecasts and the fingerprint of the inputs they were fitted on"""
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_state(self):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_file, 'w') as f:
+            json.dump(self.state, f)
+
+    def fingerprint(self, version):
+        """Identify the inputs that invalidate a forecast when they change"""
+        key = (f"{version.get('settings', 0)}|{version.get('revision', 0)}|"
+               f"{self.model_type}|{self.days}|{self.granularity}")
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def plan(self, now=None):
+        """List the due SKUs with the reason they are due, most urgent first"""
+        now = now or datetime.now()
+        versions = self.inventory_manager.get_sku_versions()
+        urgency = {s['product_id']: s['urgency'] for s in self.inventory_manager.generate_reorder_suggestions()}
+
+        due, needs_scoring = [], []
+        for product in self.inventory_manager.get_all_products():
+            product_id = product['product_id']
+            reason = self._check(product_id, versions.get(product_id, {}), now)
+            if reason == 'score':
+                needs_scoring.append(product_id)
+            elif reason is not None:
+                due.append({'product_id': product_id, 'reason': reason})
+
+        for product_id, reason in self._score_new_actuals(needs_scoring, versions).items():
+            if reason is not None:
+                due.append({'product_id': product_id, 'reason': reason})
+
+        for item in due:
+            item['urgency'] = urgency.get(item['product_id'], 'NONE')
+        due.sort(key=lambda item: (URGENCY_RANK.get(item['urgency'], NO_REORDER_RANK),
+                                   REASON_RANK[item['reason']]))
+        return due
+
+    def _check(self, product_id, version, now):
+        """Reason a SKU is due, 'score' when new actuals must be scored first, or None"""
+        entry = self.state.get(product_id)
+        if entry is None:
+            return 'new'
+        if entry['fingerprint'] != self.fingerprint(version):
+            return 'dirty'
+        if now - datetime.fromisoformat(entry['fitted_at']) > self.ttl:
+            return 'stale'
+        if version.get('sales', 0) != entry['sales_version']:
+            return 'score'
+        return None
+
+    def _score_new_actuals(self, product_ids, versions):
+        """Return {product_id: 'drift' | 'exhausted' | None} from the actuals since each fit"""
+        if not product_ids:
+            return {}
+        # One read of the rollup for all SKUs that received sales
+        rollup = self.inventory_manager.get_rollup_table(self.granularity, 'product')
+        rollup = rollup[rollup['product_id'].isin(product_ids)]
+        offset = to_offset(self.freq)
+
+        reasons = {}
+        for product_id, rows in rollup.groupby('product_id'):
+            entry = self.state[product_id]
+            result = ForecastResult.from_dict(entry['forecast'])
+            last_sale = pd.Timestamp(versions[product_id]['last_sale'])
+
+            # Only complete periods inside the forecast horizon count as actuals
+            dates = pd.DatetimeIndex(rows['date'])
+            complete = (dates >= result.start) & (dates + offset <= last_sale + timedelta(days=1))
+            actuals = pd.Series(rows['quantity_sold'].values[complete], index=dates[complete])
+            position = result.dates.get_indexer(actuals.index)
+            actuals, position = actuals[position >= 0], position[position >= 0]
+
+            reason = None
+            if result.has_interval and len(actuals) >= self.min_drift_points:
+                outside = ((actuals.values < result.lower[position]) |
+                           (actuals.values > result.upper[position]))
+                if outside.mean() > self.drift_share:
+                    reason = 'drift'
+            if reason is None and result.dates[-1] + offset <= last_sale + timedelta(days=1):
+                reason = 'exhausted'
+            if reason is None:
+                # Nothing to refit; remember the actuals have been scored
+                entry['sales_version'] = versions[product_id]['sales']
+            reasons[product_id] = reason
+        return reasons
+
+    def run(self, max_refits=None, now=None):
+        """Refit due SKUs, most urgent first; returns the plan with a status per SKU
+
+        Status is 'refitted', 'insufficient_data', 'failed' (with the
+        'error' message; the previous forecast is kept) or 'deferred'.
+        """
+        now = now or datetime.now()
+        due = self.plan(now)
+        selected = due if max_refits is None else due[:max_refits]
+        for item in due[len(selected):]:
+            item['status'] = 'deferred'
+
+        # Read versions before fitting so writes during the run leave SKUs dirty
+        versions = self.inventory_manager.get_sku_versions()
+        product_ids = [item['product_id'] for item in selected]
+        try:
+            fits, errors = self.forecaster.generate_forecasts(
+                product_ids, self.model_type, self.days, self.granularity
+            ), {}
+        except Exception:
+            # One bad SKU must not cost the others their refit
+            fits, errors = self._fit_each(product_ids)
+        for item in selected:
+            product_id = item['product_id']
+            if product_id in errors:
+                # Keep the previous forecast; the SKU stays due for the next run
+                item['status'] = 'failed'
+                item['error'] = errors[product_id]
+                continue
+            if product_id not in fits:
+                item['status'] = 'insufficient_data'
+                continue
+            result, metrics = fits[product_id]
+            self._store(product_id, result, metrics, versions.get(product_id, {}), now)
+            item['status'] = 'refitted'
+
+        # Forget SKUs removed from the catalog
+        catalog = {product['product_id'] for product in self.inventory_manager.get_all_products()}
+        for product_id in [pid for pid in self.state if pid not in catalog]:
+            del self.state[product_id]
+
+        self.save_state()
+        return due
+
+    def _fit_each(self, product_ids):
+        """Fit SKUs one at a time; returns (fits, {product_id: error message})"""
+        fits, errors = {}, {}
+        for product_id in product_ids:
+            try:
+                fits[product_id] = self.forecaster.generate_forecast(
+                    product_id, self.model_type, self.days, self.granularity
+                )
+            except ValueError:
+                # Not enough history, left out as generate_forecasts does
+                continue
+            except Exception as e:
+                errors[product_id] = f"{type(e).__name__}: {e}"
+        return fits, errors
+
+    def _store(self, product_id, result, metrics, version, now):
+        self.state[product_id] = {
+            'fingerprint': self.fingerprint(version),
+            'sales_version': version.get('sales', 0),
+            'fitted_at': now.isoformat(),
+            'metrics': {key: float(value) for key, value in metrics.items()},
+            'forecast': result.to_dict(include_history=False)
+        }
+
+    def get_forecast(self, product_id):
+        """Latest (ForecastResult, metrics) for a SKU, refitting it only if due"""
+        now = datetime.now()
+        versions = self.inventory_manager.get_sku_versions()
+        version = versions.get(product_id, {})
+        reason = self._check(product_id, version, now)
+        if reason == 'score':
+            reason = self._score_new_actuals([product_id], versions).get(product_id)
+
+        if reason is not None:
+            result, metrics = self.forecaster.generate_forecast(
+                product_id, self.model_type, self.days, self.granularity
+            )
+            self._store(product_id, result, metrics, version, now)
+            self.save_state()
+            return result, metrics
+
+        self.save_state()
+        entry = self.state[product_id]
+        result = ForecastResult.from_dict(entry['forecast'])
+        history = self.inventory_manager.get_sales_rollup(product_id, self.granularity)
+        result.history = history.set_index('date')['quantity_sold']
+        return result, entry['metrics']
@@ -0,0 +1,184 @@
+# simulation.py
+import pandas as pd
+import numpy as np
+
+# Half-width of a 95% interval in standard deviations (statsmodels' default conf_int)
+Z_95 = 1.959964
+
+class ReorderPolicy:
+    """Reorder rule in the shape used by InventoryManager.generate_reorder_suggestions.
+
+    An order is placed when the inventory position falls to
+    ``reorder_level * reorder_factor``; it covers the deficit plus
+    ``safety_factor`` times that level and arrives ``lead_time`` days later.
+    """
+    def __init__(self, name='current', reorder_factor=1.0, safety_factor=0.5, lead_time=7):
+        if lead_time < 1:
+            raise ValueError("Lead time must be at least one day")
+        self.name = name
+        self.reorder_factor = reorder_factor
+        self.safety_factor = safety_factor
+        self.lead_time = int(lead_time)
+
+class InventorySimulator:
+    """Monte Carlo evaluation of reorder policies across the whole catalog.
+
+    Demand paths are drawn once per simulator as a float32 array of shape
+    (SKUs, paths, days) and are reused for every policy so that policies are
+    compared on the same scenarios. Each path is the forecast mean plus
+    independent day-to-day noise at the model's one-step residual spread and
+    one level shock shared by every day of the path, sized so that each day
+    still matches the forecast interval. Lead-time demand is therefore as
+    uncertain as the forecast says, rather than averaging out over the days.
+    Each simulated day is a handful of array operations over all SKUs and
+    paths at once.
+    """
+    def __init__(self, forecasts, products, n_paths=2000, holding_rate=0.25, seed=None):
+        catalog = {product['product_id']: product for product in products}
+        self.product_ids = [pid for pid in forecasts if pid in catalog]
+        if not self.product_ids:
+            raise ValueError("No forecasts match products in the catalog")
+
+        horizon = min(len(forecasts[pid]) for pid in self.product_ids)
+        self.horizon = horizon
+        self.n_paths = n_paths
+        self.holding_rate = holding_rate
+
+        self.mean = np.stack([forecasts[pid].mean[:horizon] for pid in self.product_ids])
+        scales = [self._noise_scales(forecasts[pid], horizon) for pid in self.product_ids]
+        self.daily_sigma = np.array([daily for daily, _ in scales], dtype=np.float32)
+        self.level_sigma = np.stack([level for _, level in scales])
+        self.current_stock = np.array([catalog[pid]['current_stock'] for pid in self.product_ids], dtype=np.float32)
+        self.reorder_level = np.array([catalog[pid]['reorder_level'] for pid in self.product_ids], dtype=np.float32)
+        self.cost_price = np.array([catalog[pid]['cost_price'] for pid in self.product_ids], dtype=np.float32)
+
+        self.rng = np.random.default_rng(seed)
+        self.demand = self.simulate_demand()
+
+    @classmethod
+    def from_catalog(cls, forecaster, inventory_manager, model_type='ARIMA', days=30, **kwargs):
+        """Forecast every catalog product and build a simulator from the results"""
+        products = inventory_manager.get_all_products()
+        # Products without enough history are skipped by generate_forecasts
+        fits = forecaster.generate_forecasts([product['product_id'] for product in products], model_type, days)
+        forecasts = {product_id: result for product_id, (result, _) in fits.items()}
+        return cls(forecasts, products, **kwargs)
+
+    @staticmethod
+    def _forecast_sigma(result, horizon):
+        """Per-day demand standard deviation implied by a forecast interval"""
+        sigma = (result.upper[:horizon] - result.lower[:horizon]) / (2 * Z_95)
+        return np.maximum(np.nan_to_num(sigma), 0).astype(np.float32)
+
+    @classmethod
+    def _noise_scales(cls, result, horizon):
+        """Split forecast uncertainty into day-to-day noise and a per-path level shock.
+
+        The daily part is the spread of the model's one-step residuals. When
+        the forecast has an interval, the level shock carries whatever the
+        h-step band adds on top of it, so each day's total variance matches
+        the band. Without an interval only the daily part is known, and the
+        level shock is the standard error of the level it was fitted from.
+        """
+        residuals = result.residuals
+        if residuals is not None:
+            residuals = residuals[np.isfinite(residuals)]
+        if residuals is not None and len(residuals) > 1:
+            daily = float(residuals.std(ddof=1))
+        elif result.has_interval:
+            daily = float(cls._forecast_sigma(result, 1)[0])
+        else:
+            # Neither residuals nor interval: use recent day-to-day changes
+            daily = float(np.nan_to_num(result.history.tail(90).diff().std() / np.sqrt(2)))
+            residuals = None
+
+        if result.has_interval:
+            band = cls._forecast_sigma(result, horizon)
+            daily = min(daily, float(band[0]))
+            level = np.sqrt(np.maximum(band ** 2 - daily ** 2, 0))
+        else:
+            n = len(residuals) if residuals is not None and len(residuals) > 1 else 90
+            level = np.full(horizon, daily / np.sqrt(n))
+        return daily, level.astype(np.float32)
+
+    def simulate_demand(self):
+        """Draw non-negative demand paths, shape (SKUs, paths, days)"""
+        shape = (len(self.product_ids), self.n_paths, self.horizon)
+        noise = self.rng.standard_normal(shape, dtype=np.float32)
+        demand = self.mean[:, None, :] + self.daily_sigma[:, None, None] * noise
+        # One level shock per path, shared by all of its days
+        shock = self.rng.standard_normal(shape[:2], dtype=np.float32)
+        demand += self.level_sigma[:, None, :] * shock[:, :, None]
+        np.maximum(demand, 0, out=demand)
+        return demand
+
+    def evaluate(self, policy):
+        """Simulate one policy; returns per-SKU stockout probability, fill rate and holding cost"""
+        n_skus = len(self.product_ids)
+        trigger_level = (self.reorder_level * policy.reorder_factor)[:, None]
+        safety_stock = trigger_level * policy.safety_factor
+
+        stock = np.repeat(self.current_stock[:, None], self.n_paths, axis=1)
+        pipeline = np.zeros((policy.lead_time, n_skus, self.n_paths), dtype=np.float32)
+        on_order = np.zeros_like(stock)
+
+        served_total = np.zeros_like(stock)
+        stocked_out = np.zeros(stock.shape, dtype=bool)
+        stock_days = np.zeros_like(stock)
+        orders_placed = np.zeros_like(stock)
+
+        for day in range(self.horizon):
+            slot = day % policy.lead_time
+
+            # Receive orders due today
+            arrivals = pipeline[slot]
+            stock += arrivals
+            on_order -= arrivals
+            pipeline[slot] = 0
+
+            # Serve demand, lost sales when short
+            demand = self.demand[:, :, day]
+            served = np.minimum(stock, demand)
+            stock -= served
+            served_total += served
+            stocked_out |= served < demand
+            stock_days += stock
+
+            # Review inventory position and reorder
+            position = stock + on_order
+            needs_order = position <= trigger_level
+            quantity = np.where(needs_order, trigger_level - position + safety_stock, 0)
+            pipeline[slot] = quantity
+            on_order += quantity
+            orders_placed += needs_order
+
+        demand_total = self.demand.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fill_rate = served_total.sum(axis=1) / demand_total.sum(axis=1)
+        fill_rate = np.where(np.isfinite(fill_rate), fill_rate, 1.0)
+
+        daily_holding = self.cost_price * self.holding_rate / 365
+        holding_cost = stock_days.mean(axis=1) * daily_holding
+
+        return pd.DataFrame({
+            'policy': policy.name,
+            'product_id': self.product_ids,
+            'stockout_probability': stocked_out.mean(axis=1),
+            'fill_rate': fill_rate,
+            'holding_cost': holding_cost,
+            'orders_per_horizon': orders_placed.mean(axis=1)
+        })
+
+    def sweep(self, policies):
+        """Evaluate several policies on the same demand paths"""
+        return pd.concat([self.evaluate(policy) for policy in policies], ignore_index=True)
+
+    @staticmethod
+    def summarize(results):
+        """Catalog-level view of a sweep, one row per policy"""
+        return results.groupby('policy', sort=False).agg(
+            mean_stockout_probability=('stockout_probability', 'mean'),
+            worst_stockout_probability=('stockout_probability', 'max'),
+            mean_fill_rate=('fill_rate', 'mean'),
+            total_holding_cost=('holding_cost', 'sum')
+        ).reset_index()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Modules are imported from the project directory, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
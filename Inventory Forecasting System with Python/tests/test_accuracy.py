@@ -0,0 +1,105 @@
+# tests/test_accuracy.py
+import os
+import pandas as pd
+import pytest
+from accuracy import AccuracyTracker
+from models.forecast_result import ForecastResult
+
+def make_tracker(tmp_path, **kwargs):
+    return AccuracyTracker(log_file=str(tmp_path / 'forecast_log.csv'),
+                           state_dir=str(tmp_path / 'accuracy'), **kwargs)
+
+def sales(*rows):
+    return pd.DataFrame(list(rows), columns=['date', 'product_id', 'quantity_sold'])
+
+def scores(tracker, **kwargs):
+    summary = tracker.summary(by_horizon=False, **kwargs)
+    return summary.set_index(['product_id', 'model'])[['n', 'mae', 'bias']]
+
+def test_late_sales_retract_and_readd_the_score(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [5, 5, 5], '2025-01-06')})
+
+    tracker.ingest_sales(sales(('2025-01-06', 'P1', 3)))
+    assert scores(tracker).loc[('P1', 'SMA')].tolist() == [1, 2.0, 2.0]
+
+    # A late sale for the scored day replaces its actual instead of adding a point
+    tracker.ingest_sales(sales(('2025-01-06', 'P1', 1)))
+    assert scores(tracker).loc[('P1', 'SMA')].tolist() == [1, 1.0, 1.0]
+
+    tracker.ingest_sales(sales(('2025-01-07', 'P1', 7), ('2025-01-06', 'P1', 2)))
+    n, mae, bias = scores(tracker).loc[('P1', 'SMA')].tolist()
+    assert n == 2
+    assert mae == pytest.approx((1 + 2) / 2)
+    assert bias == pytest.approx((-1 - 2) / 2)
+
+def test_newer_forecast_with_the_same_lead_time_replaces_the_older(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [5], '2025-01-06')})
+    tracker.ingest_sales(sales(('2025-01-06', 'P1', 4)))
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [6], '2025-01-06')})
+    assert scores(tracker).loc[('P1', 'SMA')].tolist() == [1, 2.0, 2.0]
+
+def test_weeks_are_scored_only_once_complete(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [20, 20], '2025-01-06', freq='W-MON')},
+                             granularity='weekly')
+
+    # Monday to Saturday: the week is still open
+    tracker.ingest_sales(sales(*[(f'2025-01-{day:02d}', 'P1', 3) for day in range(6, 12)]))
+    assert tracker.summary().empty
+
+    # Sunday completes it with the full week's total
+    tracker.ingest_sales(sales(('2025-01-12', 'P1', 4)))
+    assert scores(tracker, granularity='weekly').loc[('P1', 'SMA')].tolist() == [1, 2.0, -2.0]
+
+    # The next week's first day scores nothing new; a late sale corrects the first week
+    tracker.ingest_sales(sales(('2025-01-13', 'P1', 5), ('2025-01-08', 'P1', 1)))
+    assert scores(tracker, granularity='weekly').loc[('P1', 'SMA')].tolist() == [1, 3.0, -3.0]
+
+def test_state_reloads_and_rewrites_only_changed_periods(tmp_path):
+    tracker = make_tracker(tmp_path, correction_days=3)
+    tracker.record_forecasts('SMA', {product_id: ForecastResult(None, [5] * 7, '2025-01-06')
+                                     for product_id in ('P1', 'P2')})
+    tracker.ingest_sales(sales(('2025-01-06', 'P1', 3), ('2025-01-06', 'P2', 6)))
+
+    period_dir = tmp_path / 'accuracy' / 'points' / 'daily'
+    inodes = {name: os.stat(period_dir / name).st_ino for name in os.listdir(period_dir)}
+    assert len(inodes) == 7
+
+    tracker.ingest_sales(sales(('2025-01-07', 'P1', 5)))
+    changed = {name for name in os.listdir(period_dir) if os.stat(period_dir / name).st_ino != inodes[name]}
+    assert changed == {'2025-01-07.json'}
+
+    reloaded = make_tracker(tmp_path, correction_days=3)
+    pd.testing.assert_frame_equal(reloaded.summary(), tracker.summary())
+    assert reloaded.last_day == '2025-01-07'
+
+    # Periods past the correction window are dropped from disk; their scores stay
+    reloaded.ingest_sales(sales(('2025-01-10', 'P2', 5)))
+    assert sorted(os.listdir(period_dir)) == ['2025-01-07.json', '2025-01-08.json', '2025-01-09.json',
+                                              '2025-01-10.json', '2025-01-11.json', '2025-01-12.json']
+    # P2 has sales on two of the days
+    assert scores(make_tracker(tmp_path)).loc[('P2', 'SMA'), 'n'] == 2
+
+def test_rebuild_from_sales_file_matches_incremental_scores(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [5] * 5, '2025-01-06')})
+    tracker.record_forecasts('SMA', {'P1': ForecastResult(None, [20, 20], '2025-01-06', freq='W-MON')},
+                             granularity='weekly')
+    batches = [
+        sales(('2025-01-06', 'P1', 3), ('2025-01-07', 'P1', 6)),
+        sales(('2025-01-06', 'P1', 2), ('2025-01-08', 'P1', 4)),
+        sales(*[(f'2025-01-{day:02d}', 'P1', 2) for day in range(9, 14)])
+    ]
+    for batch in batches:
+        tracker.ingest_sales(batch)
+
+    sales_file = tmp_path / 'sales_data.csv'
+    pd.concat(batches).to_csv(sales_file, index=False)
+    rebuilt = make_tracker(tmp_path)
+    rebuilt.rebuild(str(sales_file))
+    pd.testing.assert_frame_equal(rebuilt.summary(), tracker.summary())
+
+    with pytest.raises(ValueError):
+        rebuilt.rebuild()
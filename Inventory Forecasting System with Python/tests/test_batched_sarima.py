@@ -0,0 +1,100 @@
+# tests/test_batched_sarima.py
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from models.arima_model import ARIMAForecaster
+from models.batched_sarima import BatchedSARIMAForecaster
+import warnings
+warnings.filterwarnings('ignore')
+
+def make_series(count, length=90, period=7, seed=5):
+    """Poisson demand with a weekly cycle, one row per series"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    return np.vstack([rng.poisson(3 + np.sin(2 * np.pi * t / period)) for _ in range(count)]).astype(float)
+
+def fit_statsmodels(y, period, enforce, steps):
+    model = SARIMAX(y, order=(1, 1, 1), seasonal_order=(1, 1, 1, period),
+                    enforce_stationarity=enforce, enforce_invertibility=enforce)
+    fitted = model.fit(disp=False)
+    forecast = fitted.get_forecast(steps=steps)
+    interval = forecast.conf_int()
+    return model, fitted, forecast.predicted_mean, interval[:, 0], interval[:, 1]
+
+@pytest.mark.parametrize('enforce', [False, True])
+@pytest.mark.parametrize('period', [7, 12])
+def test_likelihood_and_forecast_match_statsmodels_at_same_params(enforce, period):
+    Y = make_series(3, period=period)
+    engine = BatchedSARIMAForecaster(seasonal_order=(1, 1, 1, period), enforce=enforce)
+    reference = [fit_statsmodels(y, period, enforce, 20) for y in Y]
+    params = np.vstack([fitted.params for _, fitted, _, _, _ in reference])
+
+    llf, _, mean, lower, upper = engine.filter_and_forecast(Y, params, 20)
+    np.testing.assert_allclose(engine.loglike(params, Y), [f.llf for _, f, _, _, _ in reference], atol=1e-6)
+    np.testing.assert_allclose(llf, [f.llf for _, f, _, _, _ in reference], atol=1e-6)
+    np.testing.assert_allclose(mean, [m for _, _, m, _, _ in reference], atol=1e-6)
+    np.testing.assert_allclose(lower, [l for _, _, _, l, _ in reference], atol=1e-6)
+    np.testing.assert_allclose(upper, [u for _, _, _, _, u in reference], atol=1e-6)
+
+@pytest.mark.parametrize('enforce', [False, True])
+def test_start_params_and_transform_match_statsmodels(enforce):
+    Y = make_series(3)
+    engine = BatchedSARIMAForecaster(enforce=enforce)
+    start = engine.start_params(Y)
+    for y, params in zip(Y, start):
+        model = SARIMAX(y, order=(1, 1, 1), seasonal_order=(1, 1, 1, 7),
+                        enforce_stationarity=enforce, enforce_invertibility=enforce)
+        np.testing.assert_allclose(params, model.start_params, atol=1e-8)
+        unconstrained = model.untransform_params(params)
+        np.testing.assert_allclose(engine.untransform_params(params[None])[0], unconstrained, atol=1e-8)
+        np.testing.assert_allclose(engine.transform_params(unconstrained[None])[0], params, atol=1e-8)
+
+@pytest.mark.parametrize('enforce', [False, True])
+def test_fitted_forecasts_match_statsmodels(enforce):
+    Y = make_series(12)
+    engine = BatchedSARIMAForecaster(enforce=enforce)
+    fitted = engine.forecast_arrays(Y, 30)
+    assert fitted['converged'].all()
+
+    matches = 0
+    for i, y in enumerate(Y):
+        _, reference, mean, lower, upper = fit_statsmodels(y, 7, enforce, 30)
+        # Both optimizers stop on the same likelihood surface, but where it
+        # is flat near the invertibility boundary they can stop apart
+        assert fitted['llf'][i] == pytest.approx(reference.llf, abs=0.5)
+        if (abs(fitted['llf'][i] - reference.llf) < 1e-3
+                and np.allclose(fitted['mean'][i], mean, atol=1e-2)
+                and np.allclose(fitted['lower'][i], lower, atol=1e-2)
+                and np.allclose(fitted['upper'][i], upper, atol=1e-2)):
+            matches += 1
+    assert matches >= 10
+
+def test_forecast_batch_matches_arima_forecaster():
+    index = pd.date_range('2024-01-01', periods=120, freq='D')
+    datas = {f"P{i:03d}": pd.DataFrame({'quantity_sold': y}, index=index)
+             for i, y in enumerate(make_series(4, length=120, seed=7))}
+    results, failed = BatchedSARIMAForecaster().forecast_batch(datas, 30)
+    assert failed == []
+
+    for key, data in datas.items():
+        expected, expected_metrics = ARIMAForecaster().forecast(data, 30)
+        result, metrics = results[key]
+        assert result.start == expected.start
+        np.testing.assert_allclose(result.mean, expected.mean, atol=1e-2)
+        assert metrics['rmse'] == pytest.approx(expected_metrics['rmse'], abs=1e-2)
+        assert metrics['mae'] == pytest.approx(expected_metrics['mae'], abs=1e-2)
+
+def test_forecast_batch_leaves_unconverged_and_small_groups_to_caller():
+    index = pd.date_range('2024-01-01', periods=90, freq='D')
+    datas = {i: pd.DataFrame({'quantity_sold': y}, index=index) for i, y in enumerate(make_series(3))}
+
+    results, failed = BatchedSARIMAForecaster(maxiter=1).forecast_batch(datas, 30)
+    assert results == {} and sorted(failed) == [0, 1, 2]
+
+    results, failed = BatchedSARIMAForecaster().forecast_batch(datas, 30, min_batch=4)
+    assert results == {} and sorted(failed) == [0, 1, 2]
+
+def test_requires_one_regular_and_one_seasonal_difference():
+    with pytest.raises(ValueError):
+        BatchedSARIMAForecaster(order=(1, 0, 1))